@@ -0,0 +1,62 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from corelib import timezone
+from connectinno.infra.db.alchemy.models.image import blob_deletions_table
+from connectinno.ports.repository import IRepository
+
+
+class BlobDeletionRepository(IRepository):
+    def __init__(self, session: Session):
+        self.session = session
+        self.seen = set()
+
+    @staticmethod
+    def _add_stmt(location: str):
+        return insert(blob_deletions_table).values(
+            location=location, created_at=timezone.now()
+        )
+
+    def add(self, location: str):
+        self.session.execute(self._add_stmt(location))
+
+    @staticmethod
+    def _pending_stmt(limit: int):
+        # concurrent drainers skip each other's rows where supported
+        return (
+            select(blob_deletions_table.c.id, blob_deletions_table.c.location)
+            .order_by(blob_deletions_table.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+    def pending(self, limit: int) -> list[tuple[int, str]]:
+        return [tuple(row) for row in self.session.execute(self._pending_stmt(limit))]
+
+    @staticmethod
+    def _discard_stmt(refs: list[int]):
+        return delete(blob_deletions_table).where(blob_deletions_table.c.id.in_(refs))
+
+    def discard(self, refs: list[int]) -> int:
+        return self.session.execute(self._discard_stmt(refs)).rowcount
+
+
+class AsyncBlobDeletionRepository(BlobDeletionRepository):
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)  # type: ignore
+
+    async def add(self, location: str):
+        await self.session.execute(self._add_stmt(location))
+
+    async def pending(self, limit: int) -> list[tuple[int, str]]:
+        result = await self.session.execute(self._pending_stmt(limit))
+        return [tuple(row) for row in result]
+
+    async def discard(self, refs: list[int]) -> int:
+        return (await self.session.execute(self._discard_stmt(refs))).rowcount
+
+
+__all__ = ['BlobDeletionRepository', 'AsyncBlobDeletionRepository']
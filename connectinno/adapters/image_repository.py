@@ -1,85 +1,276 @@
+from collections import Counter
 from typing import Optional
 
 from PIL import Image
 from fsspec import AbstractFileSystem
 from pydantic import TypeAdapter
-from sqlalchemy import select, update
+from sqlalchemy import and_, case, delete, insert, or_, select, update
 
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy.sql.functions import rank, count, max as max_fn
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, with_polymorphic
+from sqlalchemy.sql.functions import count
 
-from connectinno.infra.db.alchemy.models.image import images_table
+from corelib import timezone
+from connectinno.infra.db.alchemy.models.image import (
+    image_stats_table,
+    images_table,
+)
 from connectinno.infra.db.alchemy.models.transformation import (
     transformations_table,
 )
 from connectinno.ports.repository import ObjectDoesNotExists, IRepository
-from domain.entities import ImageModel
+from domain.entities import BaseTransformation, ImageModel
 from domain.aggregates.image import ImageAggregate
-from domain.entities.image import TransformedImage
+from domain.entities.image import RankedImage, TransformedImage
+from domain.value_objects.image_status import ImageStatus
+from domain.value_objects.rank_cursor import RankCursor
+from domain.value_objects.transformation_type import TransformationType
+from domain.value_objects.transformed_cursor import TransformedImageCursor
+from fileslib.io import run_fs
+
+_transformed_images_adapter = TypeAdapter(list[TransformedImage])
 
 
 class ImageRepository(IRepository):
-    def __init__(self, session: Session, fs: AbstractFileSystem):
+    def __init__(
+        self,
+        session: Session,
+        fs: AbstractFileSystem,
+        cache: Optional[AbstractFileSystem] = None,
+    ):
         self.session = session
         self.seen = set()
         self.fs = fs
+        # source images are read through the local cache when enabled
+        self.cache = cache
+        # image count increments keyed by status, flushed on commit
+        self.pending_stats: Counter = Counter()
 
-    def get(self, ref: int) -> ImageAggregate:
-        result = self.session.execute(
-            select(ImageModel).where(images_table.c.id == ref)
+    def _new_aggregate(
+        self, image_info: ImageModel, image: Optional[Image] = None
+    ) -> ImageAggregate:
+        return ImageAggregate(
+            image_info=image_info,
+            fs=self.cache or self.fs,
+            origin_fs=self.fs,
+            image=image,
         )
-        result = result.scalars().all()
-        if not result:
-            raise ObjectDoesNotExists()
-        obj = result[0]
-        aggregate = ImageAggregate(
-            image_info=obj,
-            fs=self.fs,
+
+    @staticmethod
+    def _get_stmt(
+        ref: int,
+        status: ImageStatus,
+        with_transformations: bool = False,
+        polymorphic: bool = False,
+    ):
+        stmt = select(ImageModel).where(
+            images_table.c.id == ref, images_table.c.status == status.value
         )
+        if with_transformations:
+            relation = ImageModel.transformations
+            if polymorphic:
+                # join the subtype tables up front instead of lazily loading
+                # the subtype columns per transformation
+                relation = relation.of_type(with_polymorphic(BaseTransformation, '*'))
+            stmt = stmt.options(selectinload(relation))
+        return stmt
+
+    def _to_aggregate(self, objs: list[ImageModel]) -> ImageAggregate:
+        if not objs:
+            raise ObjectDoesNotExists()
+        aggregate = self._new_aggregate(objs[0])
         self.seen.add(aggregate)
         return aggregate
 
-    def add(self, image_info: ImageModel, image: Image) -> ImageAggregate:
+    def get(
+        self,
+        ref: int,
+        status: ImageStatus = ImageStatus.ACTIVE,
+        with_transformations: bool = False,
+        polymorphic: bool = False,
+    ) -> ImageAggregate:
+        stmt = self._get_stmt(ref, status, with_transformations, polymorphic)
+        result = self.session.execute(stmt)
+        return self._to_aggregate(result.scalars().all())
+
+    @staticmethod
+    def _get_many_stmt(refs: list[int], status: ImageStatus):
+        return select(ImageModel).where(
+            images_table.c.id.in_(refs), images_table.c.status == status.value
+        )
+
+    def _to_aggregates(self, objs: list[ImageModel]) -> list[ImageAggregate]:
+        aggregates = [self._new_aggregate(obj) for obj in objs]
+        self.seen.update(aggregates)
+        return aggregates
+
+    def get_many(
+        self, refs: list[int], status: ImageStatus = ImageStatus.ACTIVE
+    ) -> list[ImageAggregate]:
+        # missing images are left out, no particular order
+        if not refs:
+            return []
+        result = self.session.execute(self._get_many_stmt(list(set(refs)), status))
+        return self._to_aggregates(result.scalars().all())
+
+    def add(
+        self, image_info: ImageModel, image: Optional[Image] = None
+    ) -> ImageAggregate:
         assert image_info.location, 'location must exists'
-        assert self.fs.exists(image_info.location), 'location must exists in fs'
+        if image_info.status == ImageStatus.ACTIVE:
+            assert self.fs.exists(image_info.location), 'location must exists in fs'
         self.session.add(image_info)
-        aggregate = ImageAggregate(
-            image_info=image_info,
-            fs=self.fs,
-            image=image,
-        )
+        self.pending_stats[ImageStatus(image_info.status).value] += 1
+        aggregate = self._new_aggregate(image_info, image)
         self.seen.add(aggregate)
         return aggregate
 
-    def rank_images(self):
-        rk = (
-            rank()
-            .over(order_by=images_table.c.transformation_count.desc())
-            .label('rank')
+    @staticmethod
+    def _rank_images_stmt(
+        limit: Optional[int] = None, after: Optional[RankCursor] = None
+    ):
+        tc = images_table.c.transformation_count
+        stmt = (
+            select(images_table.c.id, images_table.c.name, tc)
+            .where(images_table.c.status == ImageStatus.ACTIVE.value)
+            .order_by(tc.desc(), images_table.c.id.asc())
         )
-        stmt = select(images_table.c.id, images_table.c.name, rk).order_by(rk.asc())
-        tuples = self.session.execute(stmt).all()
-        return [
-            dict(zip(['id', 'original_filename', 'rank'], values)) for values in tuples
-        ]
+        if after is not None:
+            # the leading bound lets the planner seek the
+            # (transformation_count DESC, id) index instead of filtering
+            stmt = stmt.where(
+                tc <= after.count,
+                or_(
+                    tc < after.count,
+                    and_(tc == after.count, images_table.c.id > after.id),
+                ),
+            )
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        return stmt
 
-    def sync_images_transformations(self, refs: Optional[list[int]] = None):
-        stmt = select(
-            transformations_table.c.image_id,
-            count(transformations_table.c.id).label('count'),
+    @staticmethod
+    def _to_ranked(
+        tuples, limit: Optional[int] = None, after: Optional[RankCursor] = None
+    ) -> tuple[list[RankedImage], Optional[RankCursor]]:
+        # rank() semantics: tied counts share the position of their first image
+        last_count, last_rank, position = (
+            (after.count, after.rank, after.position) if after else (None, 0, 0)
+        )
+        has_more = limit is not None and len(tuples) > limit
+        images = []
+        for ref, name, transformation_count in tuples[:limit]:
+            position += 1
+            if transformation_count != last_count:
+                last_count, last_rank = transformation_count, position
+            images.append(RankedImage(id=ref, original_filename=name, rank=last_rank))
+        cursor = None
+        if has_more:
+            cursor = RankCursor(
+                count=last_count, id=images[-1].id, rank=last_rank, position=position
+            )
+        return images, cursor
+
+    def rank_images(
+        self, limit: Optional[int] = None, after: Optional[RankCursor] = None
+    ) -> tuple[list[RankedImage], Optional[RankCursor]]:
+        tuples = self.session.execute(self._rank_images_stmt(limit, after)).all()
+        return self._to_ranked(tuples, limit, after)
+
+    @staticmethod
+    def _count_stmt():
+        return select(image_stats_table.c.count).where(
+            image_stats_table.c.status == ImageStatus.ACTIVE.value
         )
 
-        if refs:
-            stmt = stmt.where(transformations_table.c.image_id.in_(refs))
+    def count_images(self) -> int:
+        return self.session.execute(self._count_stmt()).scalar_one_or_none() or 0
+
+    @staticmethod
+    def _increment_stats_stmt(status: str, n: int):
+        stats = image_stats_table.c
+        return (
+            update(image_stats_table)
+            .where(stats.status == status)
+            .values(count=stats.count + n)
+        )
+
+    def flush_stats(self):
+        for status, n in sorted(self.pending_stats.items()):
+            if not n:
+                continue
+            stmt = self._increment_stats_stmt(status, n)
+            if not self.session.execute(stmt).rowcount:
+                self.session.execute(
+                    insert(image_stats_table), {'status': status, 'count': n}
+                )
+        self.pending_stats.clear()
+
+    def discard_stats(self):
+        self.pending_stats.clear()
+
+    @staticmethod
+    def _status_counts_stmt():
+        return select(images_table.c.status, count(images_table.c.id)).group_by(
+            images_table.c.status
+        )
+
+    def rebuild_stats(self) -> int:
+        # full recount from the images table, returns the row count
+        rows = [
+            {'status': status, 'count': n}
+            for status, n in self.session.execute(self._status_counts_stmt())
+        ]
+        self.session.execute(delete(image_stats_table))
+        if rows:
+            self.session.execute(insert(image_stats_table), rows)
+        return len(rows)
 
-        subquery = stmt.group_by(transformations_table.c.image_id).alias('count')
+    @staticmethod
+    def _sync_images_transformations_stmt(refs: Optional[list[int]] = None):
+        actual = (
+            select(count(transformations_table.c.id))
+            .where(transformations_table.c.image_id == images_table.c.id)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(images_table)
+            .values(transformation_count=actual)
+            .where(images_table.c.transformation_count != actual)
+        )
+        if refs:
+            stmt = stmt.where(images_table.c.id.in_(refs))
+        return stmt
 
-        update_stmt = (
+    @staticmethod
+    def _record_transformations_stmt(
+        ref: int, transformations: list[BaseTransformation]
+    ):
+        latest = max(transformations, key=lambda obj: obj.created_at)
+        latest_created_at = timezone.naive_utc(latest.created_at)
+        latest_at = images_table.c.latest_transformation_at
+        # keep the newest one when concurrent requests commit out of order
+        is_newer = or_(latest_at.is_(None), latest_at <= latest_created_at)
+        return (
             update(images_table)
-            .values(transformation_count=subquery.c.count)
-            .where(images_table.c.id == subquery.c.image_id)  # noqa
+            .values(
+                transformation_count=images_table.c.transformation_count
+                + len(transformations),
+                latest_transformation_type=case(
+                    (is_newer, TransformationType(latest.type).value),
+                    else_=images_table.c.latest_transformation_type,
+                ),
+                latest_transformation_at=case(
+                    (is_newer, latest_created_at), else_=latest_at
+                ),
+            )
+            .where(images_table.c.id == ref)
         )
-        self.session.execute(update_stmt)
+
+    def sync_images_transformations(self, refs: Optional[list[int]] = None) -> int:
+        # full recompute for drift repair, returns the number of fixed images
+        result = self.session.execute(self._sync_images_transformations_stmt(refs))
+        return result.rowcount
 
     def update(self, aggregate: ImageAggregate):
         assert aggregate.image_info.location, 'location must exists'
@@ -87,41 +278,79 @@ class ImageRepository(IRepository):
             aggregate.image_info.location
         ), 'location must exists in fs'
         self.session.merge(aggregate.image_info)
+        if aggregate.new_transformations:
+            self.session.execute(
+                self._record_transformations_stmt(
+                    aggregate.image_info.id, aggregate.new_transformations
+                )
+            )
+            aggregate.new_transformations = []
         aggregate.image = None
         self.seen.add(aggregate)
         return aggregate
 
-    def get_latest_transformations(self) -> list[TransformedImage]:
-        subq = (
-            select(
-                transformations_table.c.image_id,
-                max_fn(transformations_table.c.created_at).label('max_created_at'),
+    @staticmethod
+    def _activate_stmt(ref: int):
+        return (
+            update(images_table)
+            .where(
+                images_table.c.id == ref,
+                images_table.c.status == ImageStatus.PENDING.value,
             )
-            .group_by(transformations_table.c.image_id)
-            .subquery()
+            .values(status=ImageStatus.ACTIVE.value)
         )
 
-        latest_transformation = aliased(transformations_table)
+    def _track_activation(self, activated: bool):
+        # only the transaction moving the row out of pending counts it
+        if activated:
+            self.pending_stats[ImageStatus.PENDING.value] -= 1
+            self.pending_stats[ImageStatus.ACTIVE.value] += 1
 
-        query = (
-            select(
-                images_table.c.id,
-                images_table.c.name.label('original_filename'),
-                latest_transformation.c.type.label('transformation_type'),
-                latest_transformation.c.created_at.label('transformation_timestamp'),
-            )
-            .select_from(images_table)
-            .join(subq, images_table.c.id == subq.c.image_id, isouter=True)  # noqa
-            .join(
-                latest_transformation,
-                (latest_transformation.c.image_id == subq.c.image_id)
-                & (latest_transformation.c.created_at == subq.c.max_created_at),
-                isouter=True,
+    def activate(self, aggregate: ImageAggregate):
+        result = self.session.execute(self._activate_stmt(aggregate.image_info.id))
+        self._track_activation(bool(result.rowcount))
+        aggregate.image_info.status = ImageStatus.ACTIVE
+        return self.update(aggregate)
+
+    @staticmethod
+    def _latest_transformations_stmt(
+        limit: Optional[int],
+        after: Optional[TransformedImageCursor],
+        transformed: bool,
+    ):
+        at = images_table.c.latest_transformation_at
+        stmt = select(
+            images_table.c.id,
+            images_table.c.name.label('original_filename'),
+            images_table.c.latest_transformation_type.label('transformation_type'),
+            at.label('transformation_timestamp'),
+        ).where(images_table.c.status == ImageStatus.ACTIVE.value)
+        # two segments, so both stay index ordered without NULLS LAST:
+        # transformed images newest first, then the untransformed ones
+        if transformed:
+            stmt = stmt.where(at.is_not(None)).order_by(
+                at.desc(), images_table.c.id.desc()
             )
-            .order_by(latest_transformation.c.created_at.desc())
-        )
+            if after is not None:
+                stmt = stmt.where(
+                    at <= after.at,
+                    or_(
+                        at < after.at,
+                        and_(at == after.at, images_table.c.id < after.id),
+                    ),
+                )
+        else:
+            stmt = stmt.where(at.is_(None)).order_by(images_table.c.id.desc())
+            if after is not None and after.at is None:
+                stmt = stmt.where(images_table.c.id < after.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
 
-        tuples = self.session.execute(query).all()
+    @staticmethod
+    def _to_transformed(
+        tuples, limit: Optional[int] = None
+    ) -> tuple[list[TransformedImage], Optional[TransformedImageCursor]]:
         data = [
             dict(
                 zip(
@@ -134,6 +363,158 @@ class ImageRepository(IRepository):
                     values,
                 )
             )
-            for values in tuples
+            for values in tuples[:limit]
         ]
-        return TypeAdapter(list[TransformedImage]).validate_python(data)
+        images = _transformed_images_adapter.validate_python(data)
+        cursor = None
+        if limit is not None and len(tuples) > limit:
+            cursor = TransformedImageCursor(
+                at=images[-1].transformation_timestamp, id=images[-1].id
+            )
+        return images, cursor
+
+    @staticmethod
+    def _remaining(limit: Optional[int], tuples: list) -> Optional[int]:
+        # one more row than requested tells whether there is a next page
+        return None if limit is None else limit + 1 - len(tuples)
+
+    def get_latest_transformations(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[TransformedImageCursor] = None,
+    ) -> tuple[list[TransformedImage], Optional[TransformedImageCursor]]:
+        tuples = []
+        if after is None or after.at is not None:
+            stmt = self._latest_transformations_stmt(
+                self._remaining(limit, tuples), after, True
+            )
+            tuples = self.session.execute(stmt).all()
+        if limit is None or len(tuples) <= limit:
+            stmt = self._latest_transformations_stmt(
+                self._remaining(limit, tuples), after, False
+            )
+            tuples += self.session.execute(stmt).all()
+        return self._to_transformed(tuples, limit)
+
+
+class AsyncImageRepository(ImageRepository):
+    session: AsyncSession
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        fs: AbstractFileSystem,
+        cache: Optional[AbstractFileSystem] = None,
+    ):
+        super().__init__(session, fs, cache)  # type: ignore
+
+    async def get(
+        self,
+        ref: int,
+        status: ImageStatus = ImageStatus.ACTIVE,
+        with_transformations: bool = False,
+        polymorphic: bool = False,
+    ) -> ImageAggregate:
+        stmt = self._get_stmt(ref, status, with_transformations, polymorphic)
+        result = await self.session.execute(stmt)
+        return self._to_aggregate(result.scalars().all())
+
+    async def rank_images(
+        self, limit: Optional[int] = None, after: Optional[RankCursor] = None
+    ) -> tuple[list[RankedImage], Optional[RankCursor]]:
+        stmt = self._rank_images_stmt(limit, after)
+        tuples = (await self.session.execute(stmt)).all()
+        return self._to_ranked(tuples, limit, after)
+
+    async def count_images(self) -> int:
+        result = await self.session.execute(self._count_stmt())
+        return result.scalar_one_or_none() or 0
+
+    async def flush_stats(self):
+        for status, n in sorted(self.pending_stats.items()):
+            if not n:
+                continue
+            stmt = self._increment_stats_stmt(status, n)
+            if not (await self.session.execute(stmt)).rowcount:
+                await self.session.execute(
+                    insert(image_stats_table), {'status': status, 'count': n}
+                )
+        self.pending_stats.clear()
+
+    async def rebuild_stats(self) -> int:
+        result = await self.session.execute(self._status_counts_stmt())
+        rows = [{'status': status, 'count': n} for status, n in result]
+        await self.session.execute(delete(image_stats_table))
+        if rows:
+            await self.session.execute(insert(image_stats_table), rows)
+        return len(rows)
+
+    async def get_many(
+        self, refs: list[int], status: ImageStatus = ImageStatus.ACTIVE
+    ) -> list[ImageAggregate]:
+        if not refs:
+            return []
+        stmt = self._get_many_stmt(list(set(refs)), status)
+        result = await self.session.execute(stmt)
+        return self._to_aggregates(result.scalars().all())
+
+    async def sync_images_transformations(
+        self, refs: Optional[list[int]] = None
+    ) -> int:
+        stmt = self._sync_images_transformations_stmt(refs)
+        return (await self.session.execute(stmt)).rowcount
+
+    async def add(
+        self, image_info: ImageModel, image: Optional[Image] = None
+    ) -> ImageAggregate:
+        assert image_info.location, 'location must exists'
+        if image_info.status == ImageStatus.ACTIVE:
+            assert await run_fs(
+                self.fs, 'exists', image_info.location
+            ), 'location must exists in fs'
+        self.session.add(image_info)
+        self.pending_stats[ImageStatus(image_info.status).value] += 1
+        aggregate = self._new_aggregate(image_info, image)
+        self.seen.add(aggregate)
+        return aggregate
+
+    async def update(self, aggregate: ImageAggregate):
+        assert aggregate.image_info.location, 'location must exists'
+        assert await run_fs(
+            self.fs, 'exists', aggregate.image_info.location
+        ), 'location must exists in fs'
+        await self.session.merge(aggregate.image_info)
+        if aggregate.new_transformations:
+            await self.session.execute(
+                self._record_transformations_stmt(
+                    aggregate.image_info.id, aggregate.new_transformations
+                )
+            )
+            aggregate.new_transformations = []
+        aggregate.image = None
+        self.seen.add(aggregate)
+        return aggregate
+
+    async def activate(self, aggregate: ImageAggregate):
+        stmt = self._activate_stmt(aggregate.image_info.id)
+        self._track_activation(bool((await self.session.execute(stmt)).rowcount))
+        aggregate.image_info.status = ImageStatus.ACTIVE
+        return await self.update(aggregate)
+
+    async def get_latest_transformations(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[TransformedImageCursor] = None,
+    ) -> tuple[list[TransformedImage], Optional[TransformedImageCursor]]:
+        tuples = []
+        if after is None or after.at is not None:
+            stmt = self._latest_transformations_stmt(
+                self._remaining(limit, tuples), after, True
+            )
+            tuples = (await self.session.execute(stmt)).all()
+        if limit is None or len(tuples) <= limit:
+            stmt = self._latest_transformations_stmt(
+                self._remaining(limit, tuples), after, False
+            )
+            tuples += (await self.session.execute(stmt)).all()
+        return self._to_transformed(tuples, limit)
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import pathlib
+import time
+from typing import Optional
+
+from fsspec import AbstractFileSystem
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from connectinno.di.keys import KeysGenerator
+from fileslib.io import run_fs
+
+# Object metadata fields which are digests of the content
+_CONTENT_HASH_FIELDS = ('md5Hash', 'ETag')
+
+
+def _content_hash(info: dict) -> Optional[str]:
+    for field in _CONTENT_HASH_FIELDS:
+        if info.get(field):
+            return f'{field}:{info[field]}'
+    return None
+
+
+def _entry_key(source_key: str, location: str, signature: str) -> str:
+    fmt = pathlib.Path(location).suffix.lower()
+    raw = '|'.join([source_key, signature, fmt])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class TransformCache:
+    """Content addressed index of transformation results.
+
+    Entries are keyed by the source content hash, the canonical plan signature
+    and the output format. The index lives in Redis while the blobs are kept
+    under `root` on the bound filesystem and evicted in LRU order once their
+    total size exceeds `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        fs: AbstractFileSystem,
+        root: str,
+        max_bytes: int,
+        keygen: KeysGenerator,
+    ):
+        self.client = client
+        self.fs = fs
+        self.root = root.rstrip('/')
+        self.max_bytes = max_bytes
+        self.keygen = keygen
+
+    def source_key(self, location: str) -> str:
+        content_hash = _content_hash(self.fs.info(location))
+        return content_hash or f'ukey:{self.fs.ukey(location)}'
+
+    def key(self, location: str, signature: str) -> str:
+        return _entry_key(self.source_key(location), location, signature)
+
+    def get(self, key: str) -> Optional[str]:
+        location = self.client.hget(self.keygen.transform_result(key), 'location')
+        pipe = self.client.pipeline()
+        if location is None:
+            pipe.hincrby(self.keygen.transform_cache_stats(), 'misses', 1)
+        else:
+            pipe.hincrby(self.keygen.transform_cache_stats(), 'hits', 1)
+            pipe.zadd(self.keygen.transform_cache_lru(), {key: time.time()})
+        pipe.execute()
+        return location
+
+    def put(self, key: str, location: str):
+        cached = f'{self.root}/{key}{pathlib.Path(location).suffix}'
+        self.fs.copy(location, cached)
+        size = self.fs.size(cached)
+        entry_key = self.keygen.transform_result(key)
+        if not self.client.hsetnx(entry_key, 'location', cached):
+            return  # concurrently cached by another request
+        pipe = self.client.pipeline()
+        pipe.hset(entry_key, 'size', size)
+        pipe.zadd(self.keygen.transform_cache_lru(), {key: time.time()})
+        pipe.incrby(self.keygen.transform_cache_size(), size)
+        pipe.execute()
+        self.evict()
+
+    def evict(self):
+        lru_key = self.keygen.transform_cache_lru()
+        size_key = self.keygen.transform_cache_size()
+        while int(self.client.get(size_key) or 0) > self.max_bytes:
+            popped = self.client.zpopmin(lru_key)
+            if not popped:
+                break
+            key, _ = popped[0]
+            entry_key = self.keygen.transform_result(key)
+            entry = self.client.hgetall(entry_key)
+            pipe = self.client.pipeline()
+            pipe.delete(entry_key)
+            pipe.decrby(size_key, int(entry.get('size', 0)))
+            pipe.hincrby(self.keygen.transform_cache_stats(), 'evictions', 1)
+            pipe.execute()
+            if entry.get('location'):
+                try:
+                    self.fs.rm(entry['location'])
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        stats = self.client.hgetall(self.keygen.transform_cache_stats())
+        return {
+            'hits': int(stats.get('hits', 0)),
+            'misses': int(stats.get('misses', 0)),
+            'evictions': int(stats.get('evictions', 0)),
+            'entries': self.client.zcard(self.keygen.transform_cache_lru()),
+            'size': int(self.client.get(self.keygen.transform_cache_size()) or 0),
+            'max_size': self.max_bytes,
+        }
+
+
+class AsyncTransformCache(TransformCache):
+    """TransformCache counterpart for event loops, shares the same index."""
+
+    client: AsyncRedis
+
+    async def source_key(self, location: str) -> str:
+        content_hash = _content_hash(await run_fs(self.fs, 'info', location))
+        if content_hash:
+            return content_hash
+        return f'ukey:{await asyncio.to_thread(self.fs.ukey, location)}'
+
+    async def key(self, location: str, signature: str) -> str:
+        return _entry_key(await self.source_key(location), location, signature)
+
+    async def get(self, key: str) -> Optional[str]:
+        location = await self.client.hget(self.keygen.transform_result(key), 'location')
+        pipe = self.client.pipeline()
+        if location is None:
+            pipe.hincrby(self.keygen.transform_cache_stats(), 'misses', 1)
+        else:
+            pipe.hincrby(self.keygen.transform_cache_stats(), 'hits', 1)
+            pipe.zadd(self.keygen.transform_cache_lru(), {key: time.time()})
+        await pipe.execute()
+        return location
+
+    async def put(self, key: str, location: str):
+        cached = f'{self.root}/{key}{pathlib.Path(location).suffix}'
+        await run_fs(self.fs, 'cp_file', location, cached)
+        size = await run_fs(self.fs, 'size', cached)
+        entry_key = self.keygen.transform_result(key)
+        if not await self.client.hsetnx(entry_key, 'location', cached):
+            return  # concurrently cached by another request
+        pipe = self.client.pipeline()
+        pipe.hset(entry_key, 'size', size)
+        pipe.zadd(self.keygen.transform_cache_lru(), {key: time.time()})
+        pipe.incrby(self.keygen.transform_cache_size(), size)
+        await pipe.execute()
+        await self.evict()
+
+    async def evict(self):
+        lru_key = self.keygen.transform_cache_lru()
+        size_key = self.keygen.transform_cache_size()
+        while int(await self.client.get(size_key) or 0) > self.max_bytes:
+            popped = await self.client.zpopmin(lru_key)
+            if not popped:
+                break
+            key, _ = popped[0]
+            entry_key = self.keygen.transform_result(key)
+            entry = await self.client.hgetall(entry_key)
+            pipe = self.client.pipeline()
+            pipe.delete(entry_key)
+            pipe.decrby(size_key, int(entry.get('size', 0)))
+            pipe.hincrby(self.keygen.transform_cache_stats(), 'evictions', 1)
+            await pipe.execute()
+            if entry.get('location'):
+                try:
+                    await run_fs(self.fs, 'rm_file', entry['location'])
+                except FileNotFoundError:
+                    pass
+
+    async def stats(self) -> dict:
+        stats = await self.client.hgetall(self.keygen.transform_cache_stats())
+        size = await self.client.get(self.keygen.transform_cache_size())
+        return {
+            'hits': int(stats.get('hits', 0)),
+            'misses': int(stats.get('misses', 0)),
+            'evictions': int(stats.get('evictions', 0)),
+            'entries': await self.client.zcard(self.keygen.transform_cache_lru()),
+            'size': int(size or 0),
+            'max_size': self.max_bytes,
+        }
+
+
+__all__ = ['TransformCache', 'AsyncTransformCache']
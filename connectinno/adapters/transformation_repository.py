@@ -1,44 +1,228 @@
+import datetime
+from collections import Counter
+from typing import Optional
+
 from pydantic import TypeAdapter
-from sqlalchemy import select
+from sqlalchemy import Date, delete, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.functions import count
+from sqlalchemy.sql.functions import count, func, sum as sum_fn
 
+from corelib import timezone
 from connectinno.ports.repository import IRepository
 from connectinno.infra.db.alchemy.models.transformation import (
+    STATS_TOTAL_BUCKET,
+    transformation_stats_table,
     transformations_table,
 )
 from connectinno.ports.repository import ObjectDoesNotExists
 from domain.entities import BaseTransformation
-from domain.value_objects.transformation_stat import TransformationByType
+from domain.value_objects.transformation_stat import StatsPeriod, TransformationByType
+from domain.value_objects.transformation_type import TransformationType
+
+_stats_adapter = TypeAdapter(list[TransformationByType])
+
+_upsert_dialects = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+    'mysql': mysql.insert,
+    'mariadb': mysql.insert,
+}
+
+
+def day_bucket(moment: datetime.datetime) -> datetime.datetime:
+    moment = timezone.naive_utc(moment)
+    return datetime.datetime.combine(moment.date(), datetime.time())
 
 
 class TransformationRepository(IRepository):
     def __init__(self, session: Session):
         self.session = session
         self.seen = set()
+        # rollup increments keyed by (type, period, bucket), flushed on commit
+        self.pending_stats: Counter = Counter()
 
-    def get(self, ref: int) -> BaseTransformation:
-        result = self.session.execute(
-            select(BaseTransformation).where(transformations_table.c.id == ref)
-        )
-        result = result.scalars().all()
-        if not result:
+    @staticmethod
+    def _get_stmt(ref: int):
+        return select(BaseTransformation).where(transformations_table.c.id == ref)
+
+    def _to_transformation(self, objs: list[BaseTransformation]) -> BaseTransformation:
+        if not objs:
             raise ObjectDoesNotExists()
-        obj = result[0]
+        obj = objs[0]
         self.seen.add(obj)
         return obj
 
+    def get(self, ref: int) -> BaseTransformation:
+        result = self.session.execute(self._get_stmt(ref))
+        return self._to_transformation(result.scalars().all())
+
     def add(self, transformation: BaseTransformation):
         self.session.add(transformation)
+        self._track(transformation)
+
+    def add_many(self, transformations: list[BaseTransformation]):
+        # Added together, the flush inserts all base rows of the chain with a
+        # single insertmanyvalues INSERT .. RETURNING (on dialects returning
+        # rows in parameter order, e.g. postgresql) followed by one INSERT per
+        # subtype table, ids keep the chain order.
+        self.session.add_all(transformations)
+        for transformation in transformations:
+            self._track(transformation)
+
+    def _track(self, transformation: BaseTransformation):
         self.seen.add(transformation)
+        kind = TransformationType(transformation.type).value
+        created_at = transformation.created_at or timezone.now()
+        self.pending_stats[(kind, StatsPeriod.TOTAL.value, STATS_TOTAL_BUCKET)] += 1
+        self.pending_stats[(kind, StatsPeriod.DAY.value, day_bucket(created_at))] += 1
+
+    @staticmethod
+    def _stats_rows(stats: Counter) -> list[dict]:
+        # a stable order keeps concurrent writers from deadlocking on row locks
+        return [
+            {'type': kind, 'period': period, 'bucket': bucket, 'count': n}
+            for (kind, period, bucket), n in sorted(stats.items())
+        ]
+
+    def _upsert_stats_stmt(self, rows: list[dict]):
+        dialect = self.session.bind.dialect.name
+        if dialect not in _upsert_dialects:
+            return None
+        stmt = _upsert_dialects[dialect](transformation_stats_table).values(rows)
+        if dialect in ('mysql', 'mariadb'):
+            return stmt.on_duplicate_key_update(
+                count=transformation_stats_table.c.count + stmt.inserted.count
+            )
+        return stmt.on_conflict_do_update(
+            index_elements=['type', 'period', 'bucket'],
+            set_={'count': transformation_stats_table.c.count + stmt.excluded.count},
+        )
+
+    @staticmethod
+    def _increment_stats_stmt(row: dict):
+        stats = transformation_stats_table.c
+        return (
+            update(transformation_stats_table)
+            .where(
+                stats.type == row['type'],
+                stats.period == row['period'],
+                stats.bucket == row['bucket'],
+            )
+            .values(count=stats.count + row['count'])
+        )
 
-    def count_transformation_by_type(self) -> list[TransformationByType]:
-        c = count(transformations_table.c.id)
-        stmt = (
-            select(c, transformations_table.c.type)
-            .group_by(transformations_table.c.type)
+    def flush_stats(self):
+        if not self.pending_stats:
+            return
+        rows = self._stats_rows(self.pending_stats)
+        stmt = self._upsert_stats_stmt(rows)
+        if stmt is not None:
+            self.session.execute(stmt)
+        else:
+            # dialects without an upsert: update, insert the missing rows
+            for row in rows:
+                if not self.session.execute(self._increment_stats_stmt(row)).rowcount:
+                    self.session.execute(insert(transformation_stats_table), row)
+        self.pending_stats.clear()
+
+    def discard_stats(self):
+        self.pending_stats.clear()
+
+    @staticmethod
+    def _count_transformation_by_type_stmt(days: Optional[int] = None):
+        stats = transformation_stats_table.c
+        if days is None:
+            return (
+                select(stats.count, stats.type)
+                .where(stats.period == StatsPeriod.TOTAL.value)
+                .order_by(stats.count.desc())
+            )
+        since = day_bucket(timezone.now()) - datetime.timedelta(days=days - 1)
+        c = sum_fn(stats.count)
+        return (
+            select(c, stats.type)
+            .where(stats.period == StatsPeriod.DAY.value, stats.bucket >= since)
+            .group_by(stats.type)
             .order_by(c.desc())
         )
-        tuples = self.session.execute(stmt).all()
+
+    @staticmethod
+    def _to_stats(tuples) -> list[TransformationByType]:
         data = [dict(zip(['count', 'type'], values)) for values in tuples]
-        return TypeAdapter(list[TransformationByType]).validate_python(data)
+        return _stats_adapter.validate_python(data)
+
+    def count_transformation_by_type(
+        self, days: Optional[int] = None
+    ) -> list[TransformationByType]:
+        stmt = self._count_transformation_by_type_stmt(days)
+        tuples = self.session.execute(stmt).all()
+        return self._to_stats(tuples)
+
+    @staticmethod
+    def _daily_counts_stmt():
+        day = func.date(transformations_table.c.created_at, type_=Date)
+        return select(
+            transformations_table.c.type, day, count(transformations_table.c.id)
+        ).group_by(transformations_table.c.type, day)
+
+    @staticmethod
+    def _rollup(tuples) -> list[dict]:
+        stats = Counter()
+        for kind, day, n in tuples:
+            stats[(kind, StatsPeriod.TOTAL.value, STATS_TOTAL_BUCKET)] += n
+            bucket = datetime.datetime.combine(day, datetime.time())
+            stats[(kind, StatsPeriod.DAY.value, bucket)] += n
+        return [
+            {'type': kind, 'period': period, 'bucket': bucket, 'count': n}
+            for (kind, period, bucket), n in sorted(stats.items())
+        ]
+
+    def rebuild_stats(self) -> int:
+        # full recompute from the transformations table, returns the row count
+        rows = self._rollup(self.session.execute(self._daily_counts_stmt()).all())
+        self.session.execute(delete(transformation_stats_table))
+        if rows:
+            self.session.execute(insert(transformation_stats_table), rows)
+        return len(rows)
+
+
+class AsyncTransformationRepository(TransformationRepository):
+    session: AsyncSession
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)  # type: ignore
+
+    async def get(self, ref: int) -> BaseTransformation:
+        result = await self.session.execute(self._get_stmt(ref))
+        return self._to_transformation(result.scalars().all())
+
+    async def flush_stats(self):
+        if not self.pending_stats:
+            return
+        rows = self._stats_rows(self.pending_stats)
+        stmt = self._upsert_stats_stmt(rows)
+        if stmt is not None:
+            await self.session.execute(stmt)
+        else:
+            for row in rows:
+                result = await self.session.execute(self._increment_stats_stmt(row))
+                if not result.rowcount:
+                    await self.session.execute(insert(transformation_stats_table), row)
+        self.pending_stats.clear()
+
+    async def count_transformation_by_type(
+        self, days: Optional[int] = None
+    ) -> list[TransformationByType]:
+        stmt = self._count_transformation_by_type_stmt(days)
+        tuples = (await self.session.execute(stmt)).all()
+        return self._to_stats(tuples)
+
+    async def rebuild_stats(self) -> int:
+        stmt = self._daily_counts_stmt()
+        rows = self._rollup((await self.session.execute(stmt)).all())
+        await self.session.execute(delete(transformation_stats_table))
+        if rows:
+            await self.session.execute(insert(transformation_stats_table), rows)
+        return len(rows)
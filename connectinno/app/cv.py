@@ -1,8 +1,12 @@
 import abc
-from typing import TYPE_CHECKING, Optional
+from io import BytesIO
+from typing import TYPE_CHECKING, Callable, Optional
 
+import PIL.Image
 from PIL.Image import Image, Resampling
+from domain.aggregates.image import ImageAggregate
 from domain.entities import transformation
+from .engine import ProcessPoolEngine
 
 
 class ITransformStrategy(metaclass=abc.ABCMeta):
@@ -10,6 +14,10 @@ class ITransformStrategy(metaclass=abc.ABCMeta):
     def execute(self, image):
         pass
 
+    @abc.abstractmethod
+    def signature(self) -> str:
+        pass
+
 
 class RotationStrategy(ITransformStrategy):
     def __init__(self, angle: int):
@@ -18,11 +26,17 @@ class RotationStrategy(ITransformStrategy):
     def execute(self, image: Image):
         return image.rotate(self.angle)
 
+    def signature(self) -> str:
+        return f'rotate:{self.angle}'
+
 
 class GrayScaleStrategy(ITransformStrategy):
     def execute(self, image: Image):
         return image.convert(mode='L')
 
+    def signature(self) -> str:
+        return 'gray-scale'
+
 
 class ResizeStrategy(ITransformStrategy):
     def __init__(self, height: int, width: int):
@@ -32,15 +46,118 @@ class ResizeStrategy(ITransformStrategy):
     def execute(self, image: Image):
         return image.resize((self.width, self.height), Resampling.BICUBIC)
 
+    def signature(self) -> str:
+        return f'resize:{self.width}x{self.height}'
+
+
+class CompositeStrategy(ITransformStrategy):
+    def __init__(self, strategies: list[ITransformStrategy]):
+        self.strategies = strategies
+
+    def execute(self, image: Image):
+        for strategy in self.strategies:
+            image = strategy.execute(image)
+        return image
+
+    def signature(self) -> str:
+        return '|'.join(strategy.signature() for strategy in self.strategies)
+
+    def draft_hint(self) -> tuple[Optional[str], Optional[tuple[int, int]]]:
+        mode, size = None, None
+        for strategy in self.strategies:
+            if isinstance(strategy, GrayScaleStrategy):
+                mode = 'L'
+                continue
+            if isinstance(strategy, ResizeStrategy):
+                size = (strategy.width, strategy.height)
+            break
+        return mode, size
+
+
+def compile_plan(strategies: list[ITransformStrategy]) -> CompositeStrategy:
+    """Rewrite a chain of strategies into a shorter execution plan.
+
+    Gray scale conversion is a per-pixel operation, so it is hoisted to the
+    front (at most once) to let every following step work on a single channel,
+    it commutes exactly with rotations and up to rounding with resizes.
+    Consecutive resizes collapse into the last requested size, resampling the
+    source once instead of every intermediate result.
+
+    Rotations are made without expanding the canvas, so all but multiples of
+    180 degrees crop the corners (and 90/270 crop any non square image), only
+    rotations by multiples of 180 degrees are exact transposes and are folded
+    together, full turns are dropped, any other rotation is kept as is.
+    """
+    gray_scale = any(isinstance(s, GrayScaleStrategy) for s in strategies)
+    plan: list[ITransformStrategy] = [GrayScaleStrategy()] if gray_scale else []
+    for strategy in strategies:
+        previous = plan[-1] if plan else None
+        match strategy:
+            case GrayScaleStrategy():
+                continue
+            case RotationStrategy() if strategy.angle % 180:
+                plan.append(strategy)
+            case RotationStrategy():
+                angle = strategy.angle % 360
+                if isinstance(previous, RotationStrategy) and not previous.angle % 180:
+                    angle = (angle + plan.pop().angle) % 360
+                if angle:
+                    plan.append(RotationStrategy(angle=angle))
+            case ResizeStrategy() if isinstance(previous, ResizeStrategy):
+                plan[-1] = strategy
+            case _:
+                plan.append(strategy)
+    return CompositeStrategy(plan)
+
+
+def transform_buffer(data, strategy: ITransformStrategy) -> bytes:
+    mode, size = None, None
+    if isinstance(strategy, CompositeStrategy):
+        mode, size = strategy.draft_hint()
+    image = ImageAggregate.decode(data, size=size, mode=mode)
+    buff = BytesIO()
+    strategy.execute(image).save(buff, image.format)
+    return buff.getvalue()
+
+
+def probe_image(
+    read: Callable[[int], bytes], max_bytes: int, chunk_size: int = 64 * 1024
+) -> Image:
+    # Only parse the header, pixel data is never decoded
+    head = bytearray()
+    while True:
+        chunk = read(min(chunk_size, max_bytes - len(head)))
+        head += chunk
+        try:
+            return PIL.Image.open(BytesIO(head))
+        except (OSError, SyntaxError):
+            if not chunk or len(head) >= max_bytes:
+                raise
+
 
 class Transformer:
-    def __init__(self, strategy: Optional[ITransformStrategy] = None):
+    def __init__(
+        self,
+        strategy: Optional[ITransformStrategy] = None,
+        engine: Optional[ProcessPoolEngine] = None,
+    ):
         self.strategy = strategy
+        self.engine = engine
 
     def transform(self, image):
         assert self.strategy, 'strategy must exists'
         return self.strategy.execute(image)
 
+    def transform_buffer(self, data) -> bytes:
+        assert self.strategy, 'strategy must exists'
+        return transform_buffer(data, self.strategy)
+
+    async def atransform_buffer(self, data) -> bytes:
+        assert self.strategy, 'strategy must exists'
+        if self.engine is None:
+            return transform_buffer(data, self.strategy)
+        return await self.engine.submit(transform_buffer, data, self.strategy)
+
     def set_strategy(self, strategy: ITransformStrategy):
         self.strategy = strategy
         return self
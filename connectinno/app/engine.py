@@ -0,0 +1,136 @@
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional
+
+
+class _SharedBuffer:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    @classmethod
+    def create(cls, data) -> '_SharedBuffer':
+        size = len(data)
+        shm = SharedMemory(create=True, size=max(size, 1))
+        try:
+            shm.buf[:size] = data
+        finally:
+            shm.close()
+        return cls(shm.name, size)
+
+    def read(self) -> bytes:
+        shm = SharedMemory(name=self.name)
+        try:
+            return bytes(shm.buf[: self.size])
+        finally:
+            shm.close()
+
+    def unlink(self):
+        try:
+            shm = SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+
+def _call(fn: Callable, source: _SharedBuffer, args: tuple):
+    shm = SharedMemory(name=source.name)
+    try:
+        with shm.buf[: source.size] as view:
+            result = fn(view, *args)
+    finally:
+        shm.close()
+    if isinstance(result, (bytes, bytearray, memoryview)):
+        return _SharedBuffer.create(result)
+    return result
+
+
+def _discard(future: Future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if isinstance(result, _SharedBuffer):
+        result.unlink()
+
+
+def _terminate(executor: ProcessPoolExecutor):
+    # the executor has no public way to stop running workers
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+
+
+class ProcessPoolEngine:
+    """Run CPU-bound callables in a process pool without blocking the event loop.
+
+    The payload and a bytes-like result are handed over through shared memory
+    instead of being pickled through the pool's pipes. `fn` receives a
+    memoryview of the payload which is only valid during the call.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_tasks_per_child: Optional[int] = None,
+        start_method: str = 'forkserver',
+    ):
+        self.timeout = timeout
+        self._max_workers = max_workers
+        self._max_tasks_per_child = max_tasks_per_child
+        self._start_method = start_method
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=get_context(self._start_method),
+            max_tasks_per_child=self._max_tasks_per_child,
+        )
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Replace a pool with a stuck worker.
+
+        New tasks go to a fresh pool right away. The old one gets no more work
+        and its processes are terminated once every task it still runs has
+        exceeded its own timeout as well.
+        """
+        if executor is not self._executor:
+            return  # already replaced
+        self._executor = self._create_executor()
+        executor.shutdown(wait=False)
+        asyncio.get_running_loop().call_later(self.timeout, _terminate, executor)
+
+    async def submit(self, fn: Callable, data, *args) -> Any:
+        source = _SharedBuffer.create(data)
+        executor = self._executor
+        try:
+            future = executor.submit(_call, fn, source, args)
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.wrap_future(future), self.timeout
+                )
+            except (TimeoutError, asyncio.CancelledError) as e:
+                # A task which has not started yet is simply dropped, a running
+                # worker can not be interrupted, release its output once done
+                if not future.cancel():
+                    future.add_done_callback(_discard)
+                    if isinstance(e, TimeoutError):
+                        self._recycle(executor)
+                raise
+        finally:
+            source.unlink()
+        if isinstance(result, _SharedBuffer):
+            try:
+                return result.read()
+            finally:
+                result.unlink()
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ['ProcessPoolEngine']
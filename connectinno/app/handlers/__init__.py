@@ -1 +1,3 @@
-__all__ = []
+from . import image
+
+__all__ = ['image']
@@ -0,0 +1,201 @@
+import logging
+import pathlib
+from io import BytesIO
+from typing import Optional
+from uuid import uuid4
+
+from connectinno.adapters.transform_cache import AsyncTransformCache, TransformCache
+from connectinno.app.cv import (
+    CompositeStrategy,
+    Transformer,
+    compile_plan,
+    strategy_from_model,
+)
+from connectinno.app.unit_of_work import AbstractUnitOfWork, AbstractAsyncUnitOfWork
+from domain.aggregates.image import ImageAggregate
+from domain.commands.transform_image import TransformImageCommand
+from domain.entities import ImageModel
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_transformation(
+    command: TransformImageCommand, uow: AbstractUnitOfWork
+) -> tuple[ImageAggregate, CompositeStrategy]:
+    aggregate: ImageAggregate = uow.images.get(command.image_id)
+    return aggregate, _plan_transformation(command, aggregate, uow)
+
+
+async def aprepare_transformation(
+    command: TransformImageCommand, uow: AbstractAsyncUnitOfWork
+) -> tuple[ImageAggregate, CompositeStrategy]:
+    aggregate: ImageAggregate = await uow.images.get(command.image_id)
+    return aggregate, _plan_transformation(command, aggregate, uow)
+
+
+def _plan_transformation(
+    command: TransformImageCommand,
+    aggregate: ImageAggregate,
+    uow: AbstractUnitOfWork | AbstractAsyncUnitOfWork,
+) -> CompositeStrategy:
+    transformations = [
+        transformation.to_domain() for transformation in command.transformations
+    ]
+
+    for obj in transformations:
+        obj.image_id = command.image_id
+    uow.transformations.add_many(transformations)
+    aggregate.new_transformations.extend(transformations)
+
+    return compile_plan([strategy_from_model(obj) for obj in transformations])
+
+
+def _new_location(aggregate: ImageAggregate, bucket: str) -> str:
+    return f'{bucket}/{uuid4()}{pathlib.Path(aggregate.image_info.location).suffix}'
+
+
+def _write_transformation(
+    uow: AbstractUnitOfWork,
+    aggregate: ImageAggregate,
+    bucket: str,
+    data: Optional[bytes] = None,
+    cached: Optional[str] = None,
+) -> str:
+    assert data is not None or cached, 'data or cached must exists'
+    old_file = aggregate.image_info.location
+    location = _new_location(aggregate, bucket)
+
+    if cached:
+        uow.file_registry.copy(cached, location)
+    else:
+        uow.file_registry.add(location, BytesIO(data))
+    aggregate.image_info.location = location
+    return old_file
+
+
+async def _awrite_transformation(
+    uow: AbstractAsyncUnitOfWork,
+    aggregate: ImageAggregate,
+    bucket: str,
+    data: Optional[bytes] = None,
+    cached: Optional[str] = None,
+) -> str:
+    assert data is not None or cached, 'data or cached must exists'
+    old_file = aggregate.image_info.location
+    location = _new_location(aggregate, bucket)
+
+    if cached:
+        await uow.file_registry.copy(cached, location)
+    else:
+        await uow.file_registry.add(location, data)
+    aggregate.image_info.location = location
+    return old_file
+
+
+def store_transformation(
+    uow: AbstractUnitOfWork,
+    aggregate: ImageAggregate,
+    bucket: str,
+    data: Optional[bytes] = None,
+    cached: Optional[str] = None,
+) -> ImageModel:
+    old_file = _write_transformation(uow, aggregate, bucket, data, cached)
+    uow.images.update(aggregate)
+    # the superseded blob is deleted in the background once this commits
+    uow.blob_deletions.add(old_file)
+    uow.commit()
+
+    return aggregate.image_info
+
+
+async def astore_transformation(
+    uow: AbstractAsyncUnitOfWork,
+    aggregate: ImageAggregate,
+    bucket: str,
+    data: Optional[bytes] = None,
+    cached: Optional[str] = None,
+) -> ImageModel:
+    old_file = await _awrite_transformation(uow, aggregate, bucket, data, cached)
+    await uow.images.update(aggregate)
+    await uow.blob_deletions.add(old_file)
+    await uow.commit()
+
+    return aggregate.image_info
+
+
+def restore_transformation(
+    uow: AbstractUnitOfWork,
+    aggregate: ImageAggregate,
+    plan: CompositeStrategy,
+    bucket: str,
+    cache: Optional[TransformCache],
+) -> tuple[Optional[ImageModel], Optional[str]]:
+    if cache is None:
+        return None, None
+    key = cache.key(aggregate.image_info.location, plan.signature())
+    cached = cache.get(key)
+    if cached is None:
+        return None, key
+    try:
+        return store_transformation(uow, aggregate, bucket, cached=cached), key
+    except FileNotFoundError:  # evicted in the meantime
+        return None, key
+
+
+async def arestore_transformation(
+    uow: AbstractAsyncUnitOfWork,
+    aggregate: ImageAggregate,
+    plan: CompositeStrategy,
+    bucket: str,
+    cache: Optional[AsyncTransformCache],
+) -> tuple[Optional[ImageModel], Optional[str]]:
+    if cache is None:
+        return None, None
+    key = await cache.key(aggregate.image_info.location, plan.signature())
+    cached = await cache.get(key)
+    if cached is None:
+        return None, key
+    try:
+        image_info = await astore_transformation(uow, aggregate, bucket, cached=cached)
+        return image_info, key
+    except FileNotFoundError:  # evicted in the meantime
+        return None, key
+
+
+def remember_transformation(
+    cache: Optional[TransformCache], key: Optional[str], image_info: ImageModel
+):
+    if cache is None or key is None:
+        return
+    try:
+        cache.put(key, image_info.location)
+    except Exception:  # noqa
+        logger.exception('Could not cache transformation %s', key)
+
+
+async def aremember_transformation(
+    cache: Optional[AsyncTransformCache], key: Optional[str], image_info: ImageModel
+):
+    if cache is None or key is None:
+        return
+    try:
+        await cache.put(key, image_info.location)
+    except Exception:  # noqa
+        logger.exception('Could not cache transformation %s', key)
+
+
+def transform_image(
+    command: TransformImageCommand,
+    uow: AbstractUnitOfWork,
+    bucket: str,
+    cache: Optional[TransformCache] = None,
+) -> ImageModel:
+    with uow:
+        aggregate, plan = prepare_transformation(command, uow)
+        image_info, key = restore_transformation(uow, aggregate, plan, bucket, cache)
+        if image_info is not None:
+            return image_info
+        data = Transformer(plan).transform_buffer(aggregate.read())
+        image_info = store_transformation(uow, aggregate, bucket, data=data)
+        remember_transformation(cache, key, image_info)
+        return image_info
@@ -1,7 +1,9 @@
 import asyncio
 import logging
+import weakref
+from collections import deque
 from inspect import Parameter
-from typing import Callable, Dict, List, Type
+from typing import Callable, Deque, Dict, List, Optional, Set, Type
 
 from dishka import Container, Scope, AsyncContainer
 from dishka.integrations.base import wrap_injection
@@ -10,11 +12,22 @@ from corelib.patterns import Singleton
 from domain import Message
 from domain.commands.base import CommandBase
 from domain.events.base import EventBase
-from .unit_of_work import AbstractUnitOfWork
+from .unit_of_work import AbstractUnitOfWork, AbstractAsyncUnitOfWork
 
 logger = logging.getLogger(__name__)
 
 
+def independent(handler: Callable) -> Callable:
+    """Mark an event handler as not depending on the other handlers of the
+    event, it may run concurrently with them on a concurrent AsyncMessageBus.
+
+    A concurrent handler gets its own request scope, hence its own unit of
+    work and session, it has to commit its changes itself.
+    """
+    handler.independent = True
+    return handler
+
+
 class MessageBus(metaclass=Singleton):
     @property
     def is_async(self) -> bool:
@@ -27,9 +40,11 @@ class MessageBus(metaclass=Singleton):
     ):
         self.event_handlers: Dict[Type[EventBase], List[Callable]] = dict()
         self.command_handlers: Dict[Type[CommandBase], Callable] = dict()
+        self.independent_handlers: Set[Callable] = set()
         for key in event_handlers.keys():
-            self.event_handlers[key] = [
-                wrap_injection(  # type: ignore
+            self.event_handlers[key] = []
+            for handler in event_handlers[key]:
+                wrapped = wrap_injection(  # type: ignore
                     func=handler,
                     is_async=self.is_async,
                     container_getter=lambda _, kwargs: kwargs['container'],
@@ -41,8 +56,9 @@ class MessageBus(metaclass=Singleton):
                         )
                     ],
                 )
-                for handler in event_handlers[key]
-            ]
+                self.event_handlers[key].append(wrapped)
+                if getattr(handler, 'independent', False):
+                    self.independent_handlers.add(wrapped)
 
         for key in command_handlers.keys():
             self.command_handlers[key] = wrap_injection(  # type: ignore
@@ -57,12 +73,38 @@ class MessageBus(metaclass=Singleton):
                     )
                 ],
             )
+        # handlers resolved per concrete message type, through its MRO
+        self._event_dispatch: Dict[type, List[Callable]] = dict()
+        self._command_dispatch: Dict[type, Optional[Callable]] = dict()
+
+    def _event_handlers_for(self, event_type: type) -> List[Callable]:
+        handlers = self._event_dispatch.get(event_type)
+        if handlers is None:
+            handlers = [
+                handler
+                for cls in event_type.__mro__
+                for handler in self.event_handlers.get(cls, [])
+            ]
+            self._event_dispatch[event_type] = handlers
+        return handlers
+
+    def _command_handler_for(self, command_type: type) -> Optional[Callable]:
+        if command_type not in self._command_dispatch:
+            self._command_dispatch[command_type] = next(
+                (
+                    self.command_handlers[cls]
+                    for cls in command_type.__mro__
+                    if cls in self.command_handlers
+                ),
+                None,
+            )
+        return self._command_dispatch[command_type]
 
     def handle(self, container: Container, message: Message):
-        queue = [message]
+        queue: Deque[Message] = deque([message])
         results = []
         while queue:
-            message = queue.pop(0)
+            message = queue.popleft()
             if isinstance(message, EventBase):
                 self.handle_event(container, message, queue)
             elif isinstance(message, CommandBase):
@@ -74,7 +116,7 @@ class MessageBus(metaclass=Singleton):
     def handle_event(self, container: Container, event: EventBase, queue):
         uow = container.get(AbstractUnitOfWork)
         found = False
-        for handler in self.event_handlers.get(type(event), []):
+        for handler in self._event_handlers_for(type(event)):
             found = True
             try:
                 logger.debug('handling event %s with handler %s', event, handler)
@@ -94,7 +136,7 @@ class MessageBus(metaclass=Singleton):
         uow = container.get(AbstractUnitOfWork)
         logger.debug('handling command %s', command)
         try:
-            handler = self.command_handlers.get(type(command), None)
+            handler = self._command_handler_for(type(command))
             if not handler:
                 raise NotImplementedError(f'Could not find a handler for {command}')
             with container(
@@ -117,16 +159,31 @@ class AsyncMessageBus(MessageBus):
         self,
         event_handlers: Dict[Type[EventBase], List[Callable]],
         command_handlers: Dict[Type[CommandBase], Callable],
+        max_concurrency: Optional[int] = None,
     ):
         super().__init__(
             event_handlers=event_handlers, command_handlers=command_handlers
         )
+        # handlers marked `independent` run concurrently, at most
+        # `max_concurrency` of them at a time, when set
+        self.max_concurrency = max_concurrency
+        # the bus outlives event loops, a semaphore is bound to the first one
+        # it waits on
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
 
     async def handle(self, container: AsyncContainer, message: Message):
-        queue = [message]
+        queue: Deque[Message] = deque([message])
         results = []
         while queue:
-            message = queue.pop(0)
+            message = queue.popleft()
             if isinstance(message, EventBase):
                 await self.handle_event(container, message, queue)
             elif isinstance(message, CommandBase):
@@ -141,25 +198,82 @@ class AsyncMessageBus(MessageBus):
         event: EventBase,
         queue,
     ):
-        uow = await container.get(AbstractUnitOfWork)
-        found = False
-        for handler in self.event_handlers.get(type(event), []):
-            found = True
+        uow = await container.get(AbstractAsyncUnitOfWork)
+        handlers = self._event_handlers_for(type(event))
+        if not handlers:
+            logger.warning(f'Could not find a handler for {event}')
+            queue.extend(uow.collect_new_events())
+            return
+        concurrent = []
+        if self.max_concurrency:
+            concurrent = [h for h in handlers if h in self.independent_handlers]
+        if not concurrent:
+            await self._run_event_handlers(container, event, handlers, queue, uow)
+            return
+        sequential = [h for h in handlers if h not in self.independent_handlers]
+        # failures are logged by each handler run, siblings are never cancelled
+        async with asyncio.TaskGroup() as group:
+            if sequential:
+                group.create_task(
+                    self._run_event_handlers(container, event, sequential, queue, uow)
+                )
+            for handler in concurrent:
+                group.create_task(self._run_isolated(container, event, handler, queue))
+
+    async def _run_event_handlers(
+        self,
+        container: AsyncContainer,
+        event: EventBase,
+        handlers: List[Callable],
+        queue,
+        uow: AbstractAsyncUnitOfWork,
+    ):
+        for handler in handlers:
+            await self._run_event_handler(container, event, handler, queue, uow)
+
+    async def _run_isolated(
+        self,
+        container: AsyncContainer,
+        event: EventBase,
+        handler: Callable,
+        queue,
+    ):
+        # an AsyncSession does not support concurrent operations, enter a
+        # fresh request scope from the app container for the handler
+        while container.registry.scope is not Scope.APP:
+            container = container.parent_container
+        async with self._semaphore():
             try:
-                logger.debug('handling event %s with handler %s', event, handler)
                 async with container(
                     {type(event): event}, scope=Scope.STEP
                 ) as step_container:
+                    uow = await step_container.get(AbstractAsyncUnitOfWork)
                     result = handler(event, container=step_container)
                     if asyncio.iscoroutine(result):
                         await result
-                queue.extend(uow.collect_new_events())
+                    queue.extend(uow.collect_new_events())
             except Exception:  # noqa
                 logger.exception('Exception handling event %s', event)
-                continue
-        if not found:
-            logger.warning(f'Could not find a handler for {event}')
+
+    async def _run_event_handler(
+        self,
+        container: AsyncContainer,
+        event: EventBase,
+        handler: Callable,
+        queue,
+        uow: AbstractAsyncUnitOfWork,
+    ):
+        try:
+            logger.debug('handling event %s with handler %s', event, handler)
+            async with container(
+                {type(event): event}, scope=Scope.STEP
+            ) as step_container:
+                result = handler(event, container=step_container)
+                if asyncio.iscoroutine(result):
+                    await result
             queue.extend(uow.collect_new_events())
+        except Exception:  # noqa
+            logger.exception('Exception handling event %s', event)
 
     async def handle_command(
         self,
@@ -167,10 +281,10 @@ class AsyncMessageBus(MessageBus):
         command: CommandBase,
         queue,
     ):
-        uow = await container.get(AbstractUnitOfWork)
+        uow = await container.get(AbstractAsyncUnitOfWork)
         logger.debug('handling command %s', command)
         try:
-            handler = self.command_handlers.get(type(command), None)
+            handler = self._command_handler_for(type(command))
             if not handler:
                 raise NotImplementedError(f'Could not find a handler for {command}')
             async with container(
@@ -1,21 +1,48 @@
 import abc
-from typing import Generator, Any
+from typing import Any, Generator, Optional
 
+from gcsfs import GCSFileSystem
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from domain import Message
 from domain.commands.base import CommandBase
 from domain.events.base import EventBase
 from connectinno.ports.repository import IRepository
-from connectinno.adapters.image_repository import ImageRepository
-from connectinno.adapters.transformation_repository import TransformationRepository
-from fileslib.fs_factory import GCSFSFactory
-from fileslib.registry import Registry
+from connectinno.adapters.blob_deletion_repository import (
+    AsyncBlobDeletionRepository,
+    BlobDeletionRepository,
+)
+from connectinno.adapters.image_repository import (
+    AsyncImageRepository,
+    ImageRepository,
+)
+from connectinno.adapters.transformation_repository import (
+    AsyncTransformationRepository,
+    TransformationRepository,
+)
+from connectinno.infra.db.alchemy.replica import ReplicaAsyncSession
+from fileslib.cached_fs import LRUFileCacheFileSystem
+from fileslib.registry import AsyncRegistry, Registry
+
+
+def _take_events(obj) -> Optional[list]:
+    # detach the pending events of a domain object
+    if isinstance(obj, dict):
+        events = obj.get('events', None)
+        if events is not None:
+            obj['events'] = []
+        return events
+    events = getattr(obj, 'events', None)
+    if events is not None:
+        obj.events = []
+    return events
 
 
 class AbstractUnitOfWork(metaclass=abc.ABCMeta):
     images: Any
     transformations: Any
+    blob_deletions: Any
     file_registry: Registry
 
     def __enter__(self) -> 'AbstractUnitOfWork':
@@ -27,46 +54,46 @@ class AbstractUnitOfWork(metaclass=abc.ABCMeta):
     def commit(self):
         self._commit()
 
+    def _event_sources(self) -> tuple[list[IRepository], list[str]]:
+        # repositories and message containers of a unit of work are set up
+        # once in __init__, resolve them on first use instead of on every call
+        sources = self.__dict__.get('_event_sources_cache')
+        if sources is None:
+            repositories, containers = [], []
+            for key, field in vars(self).items():
+                if isinstance(field, IRepository):
+                    repositories.append(field)
+                elif isinstance(field, set | dict | list):
+                    containers.append(key)
+            sources = (repositories, containers)
+            self.__dict__['_event_sources_cache'] = sources
+        return sources
+
     def collect_new_events(self) -> Generator[CommandBase | EventBase, None, None]:
-        for key, field in vars(self).items():
-            if isinstance(field, IRepository):
-                for obj in field.seen:
-                    if isinstance(obj, dict):
-                        events = obj.get('events', None)
-                        obj['events'] = []
-                    else:
-                        events = getattr(obj, 'events', None)
-                        if hasattr(obj, 'events'):
-                            events = obj.events
-                            obj.events = []
-                    if events:
-                        assert isinstance(events, list)
-                        while events:
-                            yield events.pop(0)
+        repositories, containers = self._event_sources()
+        for repository in repositories:
+            for obj in repository.seen:
+                events = _take_events(obj)
+                if events:
+                    assert isinstance(events, list)
+                    yield from events
+        for key in containers:
+            field = getattr(self, key)
             if isinstance(field, set):
-                field = list(field)
                 setattr(self, key, set())
-            if isinstance(field, dict):
-                field = list(field.values())
+            elif isinstance(field, dict):
+                field = field.values()
                 setattr(self, key, dict())
+            objs = list(field)
             if isinstance(field, list):
-                while field:
-                    obj = field.pop(0)
-                    if isinstance(obj, CommandBase | EventBase):
-                        yield obj
-                        continue
-                    events = []
-                    if isinstance(obj, dict) and 'events' in obj.keys():
-                        events = obj['events']
-                        obj['events'] = []
-                    if hasattr(obj, 'events'):
-                        events = obj.events
-                        obj.events = []
-                    if events:
-                        while events:
-                            event = events.pop(0)
-                            assert isinstance(event, CommandBase | EventBase)
-                            yield event
+                field.clear()
+            for obj in objs:
+                if isinstance(obj, CommandBase | EventBase):
+                    yield obj
+                    continue
+                for event in _take_events(obj) or ():
+                    assert isinstance(event, CommandBase | EventBase)
+                    yield event
 
     @abc.abstractmethod
     def _commit(self):
@@ -77,22 +104,107 @@ class AbstractUnitOfWork(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+class AbstractAsyncUnitOfWork(metaclass=abc.ABCMeta):
+    images: Any
+    transformations: Any
+    blob_deletions: Any
+    file_registry: AsyncRegistry
+
+    async def __aenter__(self) -> 'AbstractAsyncUnitOfWork':
+        return self
+
+    async def __aexit__(self, *args):
+        await self.rollback()
+
+    async def commit(self):
+        await self._commit()
+
+    _event_sources = AbstractUnitOfWork._event_sources
+    collect_new_events = AbstractUnitOfWork.collect_new_events
+
+    @abc.abstractmethod
+    async def _commit(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def rollback(self):
+        raise NotImplementedError
+
+
+class AbstractAsyncReadOnlyUnitOfWork(AbstractAsyncUnitOfWork):
+    async def commit(self):
+        raise RuntimeError('Read-only unit of work cannot commit.')
+
+
 class AlchemyUnitOfWork(AbstractUnitOfWork):
     messages: list[Message]
 
-    def __init__(self, session: Session, factory: GCSFSFactory):
+    def __init__(
+        self,
+        session: Session,
+        fs: GCSFileSystem,
+        cache: Optional[LRUFileCacheFileSystem],
+    ):
         super().__init__()
         self.messages = list()
         self.session = session
-        fs = factory.create()
-        self.file_registry = Registry(bind=fs)
-        self.images = ImageRepository(session, fs)
+        # the filesystem (HTTP pool, credentials) is shared by the process,
+        # only the registry of files touched by this unit of work is per use
+        self.file_registry = Registry(bind=fs, cache=cache)
+        self.images = ImageRepository(session, fs, cache)
         self.transformations = TransformationRepository(session)
+        self.blob_deletions = BlobDeletionRepository(session)
 
     def rollback(self):
+        self.images.discard_stats()
+        self.transformations.discard_stats()
         self.file_registry.rollback()
         self.session.rollback()
 
     def _commit(self):
+        self.images.flush_stats()
+        self.transformations.flush_stats()
         self.file_registry.commit()
         self.session.commit()
+
+
+class AsyncAlchemyUnitOfWork(AbstractAsyncUnitOfWork):
+    messages: list[Message]
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        fs: GCSFileSystem,
+        cache: Optional[LRUFileCacheFileSystem],
+    ):
+        super().__init__()
+        self.messages = list()
+        self.session = session
+        self.file_registry = AsyncRegistry(bind=fs, cache=cache)
+        self.images = AsyncImageRepository(session, fs, cache)
+        self.transformations = AsyncTransformationRepository(session)
+        self.blob_deletions = AsyncBlobDeletionRepository(session)
+
+    async def rollback(self):
+        self.images.discard_stats()
+        self.transformations.discard_stats()
+        await self.file_registry.rollback()
+        await self.session.rollback()
+
+    async def _commit(self):
+        await self.images.flush_stats()
+        await self.transformations.flush_stats()
+        self.file_registry.commit()
+        await self.session.commit()
+
+
+class AsyncReadOnlyAlchemyUnitOfWork(
+    AsyncAlchemyUnitOfWork, AbstractAsyncReadOnlyUnitOfWork
+):
+    def __init__(
+        self,
+        session: ReplicaAsyncSession,
+        fs: GCSFileSystem,
+        cache: Optional[LRUFileCacheFileSystem],
+    ):
+        super().__init__(session, fs, cache)
@@ -1,6 +1,7 @@
 import warnings
 
 from dishka import make_container, make_async_container, AsyncContainer
+from connectinno.di.providers.compute import ComputeProvider
 from connectinno.di.providers.factory import FactoryProvider
 from connectinno.di.providers.messagebus import MessageBusProvider
 from connectinno.di.providers.persistence import (
@@ -13,13 +14,18 @@ from connectinno.di.providers.rabbitmq import (
     AsyncRabbitMQProvider,
 )
 from connectinno.di.providers.redis import RedisProvider, AsyncRedisProvider
-from connectinno.di.providers.unit_of_work import UnitOfWorkProvider
+from connectinno.di.providers.unit_of_work import (
+    UnitOfWorkProvider,
+    AsyncUnitOfWorkProvider,
+)
 from connectinno.di.providers.firebase import FireBaseConfigsProvider
 from connectinno.infra.db.alchemy.map import start_mappers as start_alchemy
 
 
-def bootstrap_sync(essential_only=True, di_sync=True):  # noqa
+def bootstrap_sync(essential_only=True, di_sync=True, start_mappers=False):  # noqa
     warnings.filterwarnings('ignore')
+    if start_mappers:
+        start_alchemy()
     if di_sync:
         container = make_container(
             RedisProvider(),
@@ -29,17 +35,19 @@ def bootstrap_sync(essential_only=True, di_sync=True):  # noqa
             MessageBusProvider(),
             FactoryProvider(),
             FireBaseConfigsProvider(),
+            ComputeProvider(),
         )
     else:
         container = make_async_container(
             AsyncRedisProvider(),
             AsyncRabbitMQProvider(),
             AsyncPersistenceStorageProvider(),
-            UnitOfWorkProvider(),
+            AsyncUnitOfWorkProvider(),
             MessageBusProvider(),
             ProxyProvider(),
             FactoryProvider(),
             FireBaseConfigsProvider(),
+            ComputeProvider(),
         )
     return container
 
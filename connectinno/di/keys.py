@@ -9,3 +9,19 @@ class KeysGenerator(KeysGeneratorBase):
     @prefixed_key
     def file_lock(self, location: str, server_name: str):
         return self.sep.join(['file-lock', location, server_name])
+
+    @prefixed_key
+    def transform_result(self, digest: str):
+        return self.sep.join(['transform-result', digest])
+
+    @prefixed_key
+    def transform_cache_lru(self):
+        return 'transform-cache-lru'
+
+    @prefixed_key
+    def transform_cache_size(self):
+        return 'transform-cache-size'
+
+    @prefixed_key
+    def transform_cache_stats(self):
+        return 'transform-cache-stats'
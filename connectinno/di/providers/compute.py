@@ -0,0 +1,28 @@
+from typing import Iterable
+
+from dishka import Provider, provide, Scope
+
+from corelib.compute import ComputeSettings, get_compute_settings
+from connectinno.app.engine import ProcessPoolEngine
+
+
+class ComputeProvider(Provider):
+    @provide(scope=Scope.APP)
+    def get_compute_settings(self) -> ComputeSettings:
+        return get_compute_settings()
+
+    @provide(scope=Scope.APP)
+    def get_process_pool_engine(
+        self, settings: ComputeSettings
+    ) -> Iterable[ProcessPoolEngine]:
+        engine = ProcessPoolEngine(
+            max_workers=settings.COMPUTE_POOL_SIZE,
+            timeout=settings.COMPUTE_TASK_TIMEOUT,
+            max_tasks_per_child=settings.COMPUTE_MAX_TASKS_PER_CHILD,
+            start_method=settings.COMPUTE_START_METHOD,
+        )
+        yield engine
+        engine.shutdown()
+
+
+__all__ = ['ComputeProvider']
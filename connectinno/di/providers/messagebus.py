@@ -1,9 +1,14 @@
 from dishka import Provider, provide, Scope
 
+from corelib.messagebus import MessageBusSettings, get_messagebus_settings
 from connectinno.app.messagebus import MessageBus, AsyncMessageBus
 
 
 class MessageBusProvider(Provider):
+    @provide(scope=Scope.APP)
+    def get_messagebus_settings(self) -> MessageBusSettings:
+        return get_messagebus_settings()
+
     @provide(scope=Scope.APP)
     def get_message_bus(self) -> MessageBus:
         return MessageBus(
@@ -12,9 +17,10 @@ class MessageBusProvider(Provider):
         )
 
     @provide(scope=Scope.APP)
-    def get_async_message_bus(self) -> AsyncMessageBus:
+    def get_async_message_bus(self, settings: MessageBusSettings) -> AsyncMessageBus:
         # TODO import handlers
         return AsyncMessageBus(
             event_handlers={},
             command_handlers={},
+            max_concurrency=settings.MESSAGEBUS_MAX_CONCURRENCY,
         )
@@ -5,10 +5,25 @@ from fsspec import AbstractFileSystem
 from gcsfs import GCSFileSystem
 from google.cloud import storage
 from qdrant_client import QdrantClient, AsyncQdrantClient
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy import create_engine, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from firebase_admin import App as FirebaseApp
 
 from corelib.storage import StorageSettings
+from connectinno.adapters.transform_cache import (
+    AsyncTransformCache,
+    TransformCache,
+)
+from connectinno.di.keys import KeysGenerator
+from connectinno.infra.db.alchemy.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    pool_options,
+)
+from connectinno.infra.db.alchemy.replica import AsyncReplicaRouter
+from fileslib.cached_fs import LRUFileCacheFileSystem
 from fileslib.fs_factory import DefaultFSFactory, GCSFSFactory
 from fileslib.storage_service_proxy import StorageServiceProxy
 
@@ -40,11 +55,21 @@ class PersistenceStorageProvider(Provider):
     def get_gcsfs(self, factory: GCSFSFactory) -> GCSFileSystem:
         return factory.create()
 
+    @provide(scope=Scope.APP)
+    def get_file_cache(
+        self, settings: StorageSettings, factory: GCSFSFactory, fs: GCSFileSystem
+    ) -> Optional[LRUFileCacheFileSystem]:
+        if not settings.FILE_CACHE_ENABLED:
+            return None
+        return factory.lru_cached(fs, settings.FILE_CACHE_MAX_BYTES)
+
     @provide(scope=Scope.APP)
     def get_alchemy_engine(self, settings: StorageSettings) -> Engine:
         engine = create_engine(
             str(settings.SQL_DB_URL),
             echo=False,
+            poolclass=InstrumentedQueuePool,
+            **pool_options(settings),
         )
         # metadata.create_all(engine) # delegate to alembic
         return engine
@@ -59,6 +84,25 @@ class PersistenceStorageProvider(Provider):
             ),
         )
 
+    @provide(scope=Scope.APP)
+    def get_transform_cache(
+        self,
+        settings: StorageSettings,
+        app: FirebaseApp,
+        client: Redis,
+        fs: GCSFileSystem,
+        keygen: KeysGenerator,
+    ) -> Optional[TransformCache]:
+        if not settings.TRANSFORM_CACHE_ENABLED:
+            return None
+        return TransformCache(
+            client=client,
+            fs=fs,
+            root=f'{app.project_id}.appspot.com/{settings.TRANSFORM_CACHE_PREFIX}',
+            max_bytes=settings.TRANSFORM_CACHE_MAX_BYTES,
+            keygen=keygen,
+        )
+
 
 class AsyncPersistenceStorageProvider(PersistenceStorageProvider):
     _optional_async_qdrant_client = alias(
@@ -74,3 +118,56 @@ class AsyncPersistenceStorageProvider(PersistenceStorageProvider):
         )
         yield client
         await client.close()
+
+    @provide(scope=Scope.APP)
+    async def get_async_alchemy_engine(
+        self, settings: StorageSettings
+    ) -> AsyncIterable[AsyncEngine]:
+        engine = create_async_engine(
+            str(settings.SQL_DB_ASYNC_URL),
+            echo=False,
+            poolclass=InstrumentedAsyncQueuePool,
+            **pool_options(settings),
+        )
+        yield engine
+        await engine.dispose()
+
+    @provide(scope=Scope.APP)
+    async def get_async_replica_router(
+        self, settings: StorageSettings, engine: AsyncEngine
+    ) -> AsyncIterable[AsyncReplicaRouter]:
+        replica = None
+        if settings.SQL_DB_REPLICA_ASYNC_URL is not None:
+            replica = create_async_engine(
+                str(settings.SQL_DB_REPLICA_ASYNC_URL),
+                echo=False,
+                poolclass=InstrumentedAsyncQueuePool,
+                **pool_options(settings),
+            )
+        router = AsyncReplicaRouter(
+            primary=engine,
+            replica=replica,
+            max_lag=settings.SQL_DB_REPLICA_MAX_LAG,
+            check_interval=settings.SQL_DB_REPLICA_LAG_CHECK_INTERVAL,
+        )
+        yield router
+        await router.dispose()
+
+    @provide(scope=Scope.APP)
+    def get_async_transform_cache(
+        self,
+        settings: StorageSettings,
+        app: FirebaseApp,
+        client: AsyncRedis,
+        fs: GCSFileSystem,
+        keygen: KeysGenerator,
+    ) -> Optional[AsyncTransformCache]:
+        if not settings.TRANSFORM_CACHE_ENABLED:
+            return None
+        return AsyncTransformCache(
+            client=client,
+            fs=fs,
+            root=f'{app.project_id}.appspot.com/{settings.TRANSFORM_CACHE_PREFIX}',
+            max_bytes=settings.TRANSFORM_CACHE_MAX_BYTES,
+            keygen=keygen,
+        )
@@ -1,11 +1,13 @@
 from typing import AsyncIterable, Optional, Iterable
 
+from celery import Celery
 from dishka import Provider, provide, Scope, alias
 from faststream.rabbit import RabbitBroker
 from kombu import Connection, Producer, pools
 from kombu.connection import ConnectionPool
 from pika import BlockingConnection, URLParameters
 from corelib.broker import RabbitMQSettings
+from corelib.celery.config import build_application
 from connectinno.infra.broker.connection import init_blocking_connection
 
 
@@ -50,3 +52,10 @@ class AsyncRabbitMQProvider(RabbitMQProvider):
         await broker.connect()
         yield broker
         await broker.close()
+
+    @provide(scope=Scope.APP)
+    def get_celery_app(self) -> Iterable[Celery]:
+        # one producer pool for the process, tasks are only published from here
+        app = build_application(strict_typing=False)
+        yield app
+        app.close()
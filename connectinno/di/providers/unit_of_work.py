@@ -1,6 +1,17 @@
+from typing import AsyncIterable
+
 from dishka import Provider, provide, Scope, alias
 
-from connectinno.app.unit_of_work import AlchemyUnitOfWork, AbstractUnitOfWork
+from connectinno.app.unit_of_work import (
+    AlchemyUnitOfWork,
+    AbstractUnitOfWork,
+    AsyncAlchemyUnitOfWork,
+    AbstractAsyncUnitOfWork,
+    AbstractAsyncReadOnlyUnitOfWork,
+    AsyncReadOnlyAlchemyUnitOfWork,
+)
+from connectinno.infra.db.alchemy.replica import AsyncReplicaRouter, ReplicaAsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
 
@@ -12,3 +23,38 @@ class UnitOfWorkProvider(Provider):
     @provide(scope=Scope.REQUEST)
     def get_session(self, factory: sessionmaker) -> Session:
         return factory()
+
+
+class AsyncUnitOfWorkProvider(UnitOfWorkProvider):
+    async_uow = provide(AsyncAlchemyUnitOfWork, scope=Scope.REQUEST)
+
+    abstract_async_uow = alias(
+        source=AsyncAlchemyUnitOfWork, provides=AbstractAsyncUnitOfWork
+    )
+
+    @provide(scope=Scope.APP)
+    def get_async_session_maker(self, engine: AsyncEngine) -> async_sessionmaker:
+        # Attributes are not lazily refreshed under asyncio, keep them after commit
+        return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_async_session(
+        self, factory: async_sessionmaker
+    ) -> AsyncIterable[AsyncSession]:
+        async with factory() as session:
+            yield session
+
+    async_read_only_uow = provide(AsyncReadOnlyAlchemyUnitOfWork, scope=Scope.REQUEST)
+
+    abstract_async_read_only_uow = alias(
+        source=AsyncReadOnlyAlchemyUnitOfWork,
+        provides=AbstractAsyncReadOnlyUnitOfWork,
+    )
+
+    @provide(scope=Scope.REQUEST)
+    async def get_replica_async_session(
+        self, router: AsyncReplicaRouter
+    ) -> AsyncIterable[ReplicaAsyncSession]:
+        engine = await router.engine()
+        async with ReplicaAsyncSession(bind=engine, expire_on_commit=False) as session:
+            yield session
@@ -1,6 +1,13 @@
+import base64
 import datetime
+from typing import Literal, Optional, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, ValidationError
+
+from connectinno.drivers.api.schema.views import PaginatedViewBase
+from domain.entities.image import RankedImage, TransformedImage
+
+CursorT = TypeVar('CursorT', bound=BaseModel)
 
 
 class ImageInfo(BaseModel):
@@ -9,3 +16,43 @@ class ImageInfo(BaseModel):
     created_at: datetime.datetime
 
     model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class ImageBatch(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=500)
+
+
+class UploadInitiation(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+
+
+class UploadTicket(BaseModel):
+    id: int
+    url: HttpUrl
+    method: Literal['PUT'] = 'PUT'
+    expires_in: int
+
+
+class UploadCompletion(BaseModel):
+    id: int
+
+
+class RankedImagePage(PaginatedViewBase):
+    items: list[RankedImage]
+    next: Optional[str] = None
+
+
+class TransformedImagePage(PaginatedViewBase):
+    items: list[TransformedImage]
+    next: Optional[str] = None
+
+
+def encode_cursor(cursor: BaseModel) -> str:
+    return base64.urlsafe_b64encode(cursor.model_dump_json().encode()).decode()
+
+
+def decode_cursor(token: str, model: type[CursorT]) -> CursorT:
+    try:
+        return model.model_validate_json(base64.urlsafe_b64decode(token))
+    except (ValueError, ValidationError) as e:
+        raise ValueError('invalid cursor') from e
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import field_validator, ValidationInfo
+
+from corelib.celery.task import TaskBase, TaskStatus
+from .image import ImageInfo
+
+
+class TransformImageTask(TaskBase):
+    result: Optional[ImageInfo] = None
+
+    @field_validator('result', mode='before')
+    @classmethod
+    def drop_failure_result(cls, v, info: ValidationInfo):  # noqa
+        # Failed tasks store the exception details as result
+        if info.data.get('status') != TaskStatus.success:
+            return None
+        return v
@@ -1,140 +1,339 @@
+import asyncio
 import pathlib
-from io import BytesIO
-from typing import Annotated
+from contextlib import suppress
+from typing import Annotated, Optional
 from uuid import uuid4
 
-import PIL.Image
+from celery import Celery
 from firebase_admin import App as FirebaseApp
 from dishka.integrations.fastapi import inject
-from fastapi import APIRouter, Path, UploadFile, File
-from pydantic import TypeAdapter
+from fastapi import APIRouter, Path, Query, Response, UploadFile, File
+from redis.asyncio import Redis as AsyncRedis
+from starlette import status
 
-from connectinno.app.cv import Transformer, strategy_from_model
-from connectinno.app.unit_of_work import AbstractUnitOfWork
+from connectinno.adapters.transform_cache import AsyncTransformCache
+from connectinno.app.cv import Transformer, probe_image
+from connectinno.app.handlers import image as image_handlers
+from connectinno.app.engine import ProcessPoolEngine
+from connectinno.app.unit_of_work import (
+    AbstractAsyncReadOnlyUnitOfWork,
+    AbstractAsyncUnitOfWork,
+)
 from connectinno.di import FromDI
-from connectinno.drivers.api.schema.v1.image import ImageInfo
-from corelib.web.constants import HTTP_422_NOT_FOUND_EXCEPTION
+from connectinno.drivers.api.schema.v1.image import (
+    ImageBatch,
+    ImageInfo,
+    RankedImagePage,
+    TransformedImagePage,
+    decode_cursor,
+    encode_cursor,
+    UploadCompletion,
+    UploadInitiation,
+    UploadTicket,
+)
+from connectinno.drivers.api.schema.v1.task import TransformImageTask
+from connectinno.drivers.celery.tasks import transform_image as transform_image_task
+from connectinno.infra.cache.queries import get_celery_task, wait_celery_task
+from corelib.celery.task import TaskStatus
+from corelib.storage import StorageSettings
+from corelib.web.constants import (
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION,
+    HTTP_422_NOT_FOUND_EXCEPTION,
+)
+from corelib.web.routing import LimitedBodyRoute
 from domain.aggregates.image import ImageAggregate
 from domain.commands.transform_image import TransformImageCommand
-from domain.entities.image import ImageUrl, RankedImage, ImageModel, TransformedImage
+from domain.entities.image import ImageUrl, ImageModel
+from domain.value_objects.image_status import ImageStatus
+from domain.value_objects.rank_cursor import RankCursor
+from domain.value_objects.transformed_cursor import TransformedImageCursor
 from domain.value_objects.transformation_stat import TransformationByType
 from fileslib.storage_service_proxy import StorageServiceProxy
 
+# Room for the multipart boundaries and part headers around the file
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRoute(LimitedBodyRoute):
+    # Oversized uploads are rejected before Starlette spools them to disk
+    async def body_limit(self, scope) -> int:
+        container = scope['app'].state.dishka_container
+        settings = await container.get(StorageSettings)
+        return settings.UPLOAD_MAX_BYTES + _MULTIPART_OVERHEAD
+
+
 router = APIRouter()
+upload_router = APIRouter(route_class=UploadRoute)
 
 
 @router.get('/get-image/{image_id}', response_model=ImageUrl, status_code=200)
 @inject
 async def get_image(
     image_id: Annotated[int, Path()],
-    uow: FromDI[AbstractUnitOfWork],
+    uow: FromDI[AbstractAsyncUnitOfWork],
     proxy: FromDI[StorageServiceProxy],
 ):
-    with uow:
-        aggregate: ImageAggregate = uow.images.get(image_id)
+    async with uow:
+        aggregate: ImageAggregate = await uow.images.get(image_id)
         location = aggregate.image_info.location
-    return {'id': image_id, 'url': proxy.generate_signed_url(location, 'GET')}
+    return {'id': image_id, 'url': await proxy.agenerate_signed_url(location, 'GET')}
+
 
+@router.post('/get-images', response_model=list[ImageUrl], status_code=200)
+@inject
+async def get_images(
+    body: ImageBatch,
+    uow: FromDI[AbstractAsyncUnitOfWork],
+    proxy: FromDI[StorageServiceProxy],
+):
+    async with uow:
+        aggregates: list[ImageAggregate] = await uow.images.get_many(body.ids)
+        locations = {
+            aggregate.image_info.id: aggregate.image_info.location
+            for aggregate in aggregates
+        }
+    # unknown ids are skipped, the rest keep the requested order
+    ids = [image_id for image_id in dict.fromkeys(body.ids) if image_id in locations]
+    urls = await proxy.agenerate_signed_urls(
+        [locations[image_id] for image_id in ids], 'GET', parallel=True
+    )
+    return [{'id': image_id, 'url': url} for image_id, url in zip(ids, urls)]
 
-@router.get('/rank-images', status_code=200)
+
+@router.get('/rank-images', status_code=200, response_model=RankedImagePage)
 @inject
-async def rank_image(uow: FromDI[AbstractUnitOfWork]) -> list[RankedImage]:
-    with uow:
-        data = uow.images.rank_images()
-    return TypeAdapter(list[RankedImage]).validate_python(data)
+async def rank_image(
+    uow: FromDI[AbstractAsyncReadOnlyUnitOfWork],
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    after: Annotated[Optional[str], Query()] = None,
+):
+    try:
+        cursor = decode_cursor(after, RankCursor) if after else None
+    except ValueError:
+        raise HTTP_422_NOT_FOUND_EXCEPTION
+    async with uow:
+        if cursor is None or cursor.total is None:
+            total = await uow.images.count_images()
+        else:
+            # counted once on the first page and carried along by the cursor
+            total = cursor.total
+        items, next_cursor = await uow.images.rank_images(limit=limit, after=cursor)
+    if next_cursor is not None:
+        next_cursor.total = total
+    return RankedImagePage(
+        total=total,
+        items=items,
+        next=encode_cursor(next_cursor) if next_cursor else None,
+    )
 
 
 @router.get('/transformation-by-type', status_code=200)
 @inject
 async def count_transformation_by_type(
-    uow: FromDI[AbstractUnitOfWork],
+    uow: FromDI[AbstractAsyncReadOnlyUnitOfWork],
+    days: Annotated[Optional[int], Query(ge=1, le=366)] = None,
 ) -> list[TransformationByType]:
-    with uow:
-        data = uow.transformations.count_transformation_by_type()
+    async with uow:
+        data = await uow.transformations.count_transformation_by_type(days=days)
     return data
 
 
-@router.get('/image-latest-transformations', status_code=200)
+@router.get(
+    '/image-latest-transformations',
+    status_code=200,
+    response_model=TransformedImagePage,
+)
 @inject
 async def get_latest_transformations(
-    uow: FromDI[AbstractUnitOfWork],
-) -> list[TransformedImage]:
-    with uow:
-        data = uow.images.get_latest_transformations()
-    return data
+    uow: FromDI[AbstractAsyncReadOnlyUnitOfWork],
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    after: Annotated[Optional[str], Query()] = None,
+):
+    try:
+        cursor = decode_cursor(after, TransformedImageCursor) if after else None
+    except ValueError:
+        raise HTTP_422_NOT_FOUND_EXCEPTION
+    async with uow:
+        if cursor is None or cursor.total is None:
+            total = await uow.images.count_images()
+        else:
+            total = cursor.total
+        items, next_cursor = await uow.images.get_latest_transformations(
+            limit=limit, after=cursor
+        )
+    if next_cursor is not None:
+        next_cursor.total = total
+    return TransformedImagePage(
+        total=total,
+        items=items,
+        next=encode_cursor(next_cursor) if next_cursor else None,
+    )
 
 
-@router.post('/upload-image', status_code=201, response_model=ImageInfo)
+@upload_router.post('/upload-image', status_code=201, response_model=ImageInfo)
 @inject
 async def upload_image(
     file: Annotated[UploadFile, File()],
     app: FromDI[FirebaseApp],
-    uow: FromDI[AbstractUnitOfWork],
+    uow: FromDI[AbstractAsyncUnitOfWork],
+    settings: FromDI[StorageSettings],
 ):
-    with uow:
-        buff = BytesIO()
-        buff.write(await file.read())
-        buff.seek(0)
+    if file.size is not None and file.size > settings.UPLOAD_MAX_BYTES:
+        raise HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION
+    async with uow:
+        # Starlette spools the upload to disk, stream it from there in chunks
         try:
-            image_object = PIL.Image.open(buff)
-            image_object.verify()
+            await asyncio.to_thread(
+                probe_image, file.file.read, settings.UPLOAD_MAX_HEADER_BYTES
+            )
         except (IOError, SyntaxError):
             raise HTTP_422_NOT_FOUND_EXCEPTION
-        buff.seek(0)
+        file.file.seek(0)
         location = f'{app.project_id}.appspot.com/{uuid4()}{pathlib.Path(file.filename).suffix}'
-        uow.file_registry.add(location, buff)
+        await uow.file_registry.add(location, file.file)
         image = ImageModel(
             location=location, name=file.filename, transformation_count=0
         )
-        aggregate: ImageAggregate = uow.images.add(image, image_object)
-        uow.commit()
-        return aggregate.image_info
+        aggregate: ImageAggregate = await uow.images.add(image)
+        await uow.commit()
+        # the mapped entity can not be serialized, its relations raise on load
+        return ImageInfo.model_validate(aggregate.image_info)
 
 
-@router.post('/transform-image', status_code=200, response_model=ImageInfo)
+@router.post('/upload-image/initiate', status_code=201, response_model=UploadTicket)
 @inject
-async def transform_image(
-    command: TransformImageCommand,
-    uow: FromDI[AbstractUnitOfWork],
+async def initiate_upload(
+    body: UploadInitiation,
     app: FromDI[FirebaseApp],
+    uow: FromDI[AbstractAsyncUnitOfWork],
+    proxy: FromDI[StorageServiceProxy],
+):
+    location = (
+        f'{app.project_id}.appspot.com/{uuid4()}{pathlib.Path(body.filename).suffix}'
+    )
+    async with uow:
+        image = ImageModel(
+            location=location,
+            name=body.filename,
+            transformation_count=0,
+            status=ImageStatus.PENDING,
+        )
+        aggregate: ImageAggregate = await uow.images.add(image)
+        await uow.commit()
+        image_id = aggregate.image_info.id
+    return {
+        'id': image_id,
+        'url': await proxy.agenerate_signed_url(location, 'PUT'),
+        'expires_in': proxy.signature_expires_in,
+    }
+
+
+@router.post('/upload-image/complete', status_code=200, response_model=ImageInfo)
+@inject
+async def complete_upload(
+    body: UploadCompletion,
+    uow: FromDI[AbstractAsyncUnitOfWork],
+    settings: FromDI[StorageSettings],
 ):
-    with uow:
-        aggregate: ImageAggregate = uow.images.get(command.image_id)
-        aggregate = aggregate.load()
-
-        transformations = [
-            transformation.to_domain() for transformation in command.transformations
-        ]
-
-        transformed_image = aggregate.image
-        transformer = Transformer()
-
-        for obj in transformations:
-            obj.image_id = command.image_id
-            uow.transformations.add(obj)
-            transformer.set_strategy(strategy_from_model(obj))
-            transformed_image = transformer.transform(transformed_image)
-
-        buff = BytesIO()
-        transformed_image.save(buff, aggregate.image.format)
-        buff.seek(0)
-
-        old_file = aggregate.image_info.location
-        location = (
-            f'{app.project_id}.appspot.com/{uuid4()}{pathlib.Path(old_file).suffix}'
+    async with uow:
+        aggregate: ImageAggregate = await uow.images.get(
+            body.id, status=ImageStatus.PENDING
         )
+        if not await aggregate.aexists():
+            raise HTTP_422_NOT_FOUND_EXCEPTION
+        size = await aggregate.asize()
+        if size > settings.UPLOAD_MAX_BYTES:
+            await uow.file_registry.remove(aggregate.image_info.location)
+            raise HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION
+        offset = 0
+
+        def read(n: int) -> bytes:
+            nonlocal offset
+            if offset >= size:
+                return b''
+            chunk = aggregate.read_range(offset, min(offset + n, size))
+            offset += len(chunk)
+            return chunk
+
+        try:
+            # the ranged reads block, probe from a worker thread
+            await asyncio.to_thread(probe_image, read, settings.UPLOAD_MAX_HEADER_BYTES)
+        except (IOError, SyntaxError):
+            await uow.file_registry.remove(aggregate.image_info.location)
+            raise HTTP_422_NOT_FOUND_EXCEPTION
+        await uow.images.activate(aggregate)
+        await uow.commit()
+        return ImageInfo.model_validate(aggregate.image_info)
 
-        uow.file_registry.add(location, buff)
-        aggregate.image_info.location = location
-        uow.images.update(aggregate)
-        uow.commit()
 
-        # post-processing may happen in the background
-        # but for simplicity will fire them up in the reqeust/response cycle
-        uow.file_registry.remove(old_file)
+@router.post(
+    '/transform-image',
+    status_code=200,
+    response_model=ImageInfo | TransformImageTask,
+    responses={202: {'model': TransformImageTask}},
+)
+@inject
+async def transform_image(
+    command: TransformImageCommand,
+    response: Response,
+    uow: FromDI[AbstractAsyncUnitOfWork],
+    app: FromDI[FirebaseApp],
+    engine: FromDI[ProcessPoolEngine],
+    cache: FromDI[Optional[AsyncTransformCache]],
+    celery: FromDI[Celery],
+    run_async: Annotated[bool, Query(alias='async')] = False,
+):
+    if run_async:
+        # publishing blocks on the broker connection
+        result = await asyncio.to_thread(
+            celery.send_task,
+            transform_image_task.name,
+            kwargs={'command': command.model_dump(mode='json')},
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return TransformImageTask(
+            task_id=result.id,
+            name=transform_image_task.name,
+            status=TaskStatus.pending,
+        )
 
-        uow.images.sync_images_transformations()
+    bucket = f'{app.project_id}.appspot.com'
+    async with uow:
+        aggregate, plan = await image_handlers.aprepare_transformation(command, uow)
+        image_info, key = await image_handlers.arestore_transformation(
+            uow, aggregate, plan, bucket, cache
+        )
+        if image_info is not None:
+            return ImageInfo.model_validate(image_info)
+        transformer = Transformer(plan, engine=engine)
+        data = await transformer.atransform_buffer(await aggregate.aread())
+        image_info = await image_handlers.astore_transformation(
+            uow, aggregate, bucket, data=data
+        )
+        await image_handlers.aremember_transformation(cache, key, image_info)
+        return ImageInfo.model_validate(image_info)
 
-        uow.commit()
 
-        return aggregate.image_info
+@router.get(
+    '/transform-image/{task_id}', status_code=200, response_model=TransformImageTask
+)
+@inject
+async def get_transform_image_task(
+    task_id: Annotated[str, Path()],
+    client: FromDI[AsyncRedis],
+    timeout: Annotated[Optional[float], Query(gt=0, le=60)] = None,
+):
+    raw = None
+    if timeout:
+        with suppress(TimeoutError):
+            raw = await wait_celery_task(client, task_id, timeout)
+    if raw is None:
+        raw = await get_celery_task(client, task_id)
+    if raw is None:
+        # Task meta is stored once a worker picks the task up
+        return TransformImageTask(
+            task_id=task_id,
+            name=transform_image_task.name,
+            status=TaskStatus.pending,
+        )
+    return TransformImageTask.model_validate_json(raw)
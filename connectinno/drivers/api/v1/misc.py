@@ -1,4 +1,13 @@
+from typing import Optional
+
+from dishka.integrations.fastapi import inject
 from fastapi import APIRouter
+from sqlalchemy import Engine, Pool
+
+from connectinno.adapters.transform_cache import AsyncTransformCache
+from connectinno.di import FromDI
+from connectinno.infra.db.alchemy.replica import AsyncReplicaRouter
+from fileslib.cached_fs import LRUFileCacheFileSystem
 
 router = APIRouter()
 
@@ -11,3 +20,36 @@ def health():
 @router.post('/ping', response_model=str)
 def ping():
     return 'pong'
+
+
+@router.get('/transform-cache', response_model=Optional[dict])
+@inject
+async def transform_cache_stats(cache: FromDI[Optional[AsyncTransformCache]]):
+    if cache is None:
+        return None
+    return await cache.stats()
+
+
+@router.get('/file-cache', response_model=Optional[dict])
+@inject
+async def file_cache_stats(cache: FromDI[Optional[LRUFileCacheFileSystem]]):
+    if cache is None:
+        return None
+    return cache.lru_stats()
+
+
+def _pool_stats(pool: Pool) -> Optional[dict]:
+    if not hasattr(pool, 'stats'):
+        return None
+    return pool.stats()
+
+
+@router.get('/db-pool', response_model=dict[str, Optional[dict]])
+@inject
+async def db_pool_stats(engine: FromDI[Engine], db: FromDI[AsyncReplicaRouter]):
+    # the sync engine serves the sync units of work (Celery, sync handlers)
+    return {
+        'sync': _pool_stats(engine.pool),
+        'primary': _pool_stats(db.primary.sync_engine.pool),
+        'replica': _pool_stats(db.replica.sync_engine.pool) if db.replica else None,
+    }
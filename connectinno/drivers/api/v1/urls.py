@@ -7,3 +7,4 @@ from . import image
 router = APIRouter(prefix=API_V1_STR)
 router.include_router(misc.router, tags=['Miscellaneous'], prefix='/misc')
 router.include_router(image.router, tags=['Images'])
+router.include_router(image.upload_router, tags=['Images'])
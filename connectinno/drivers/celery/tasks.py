@@ -1 +1,104 @@
-__all__ = []
+from typing import Optional
+
+from celery import shared_task
+from firebase_admin import App as FirebaseApp
+
+from connectinno.adapters.transform_cache import TransformCache
+from connectinno.app.handlers import image as image_handlers
+from connectinno.app.unit_of_work import AbstractUnitOfWork
+from connectinno.di import FromDI
+from connectinno.di.celery import inject, with_di_container
+from connectinno.drivers.api.schema.v1.image import ImageInfo
+from domain.commands.transform_image import TransformImageCommand
+
+
+@shared_task(bind=True)
+@with_di_container
+@inject
+def transform_image(
+    self,
+    command: dict,
+    uow: FromDI[AbstractUnitOfWork],
+    app: FromDI[FirebaseApp],
+    cache: FromDI[Optional[TransformCache]],
+    **kwargs,
+):
+    image_info = image_handlers.transform_image(
+        TransformImageCommand.model_validate(command),
+        uow,
+        bucket=f'{app.project_id}.appspot.com',
+        cache=cache,
+    )
+    return ImageInfo.model_validate(image_info).model_dump(mode='json')
+
+
+@shared_task(bind=True)
+@with_di_container
+@inject
+def reconcile_transformation_counts(
+    self,
+    uow: FromDI[AbstractUnitOfWork],
+    **kwargs,
+):
+    with uow:
+        fixed = uow.images.sync_images_transformations()
+        uow.commit()
+    return fixed
+
+
+@shared_task(bind=True)
+@with_di_container
+@inject
+def rebuild_transformation_stats(
+    self,
+    uow: FromDI[AbstractUnitOfWork],
+    **kwargs,
+):
+    with uow:
+        rows = uow.transformations.rebuild_stats()
+        uow.commit()
+    return rows
+
+
+@shared_task(bind=True)
+@with_di_container
+@inject
+def rebuild_image_stats(
+    self,
+    uow: FromDI[AbstractUnitOfWork],
+    **kwargs,
+):
+    with uow:
+        rows = uow.images.rebuild_stats()
+        uow.commit()
+    return rows
+
+
+@shared_task(bind=True)
+@with_di_container
+@inject
+def drain_blob_deletions(
+    self,
+    uow: FromDI[AbstractUnitOfWork],
+    limit: int = 500,
+    **kwargs,
+):
+    with uow:
+        pending = uow.blob_deletions.pending(limit)
+        if not pending:
+            return 0
+        # rows are only discarded once their blobs are gone, a failed run
+        # is simply retried by the next one
+        uow.file_registry.remove_many([location for _, location in pending])
+        uow.blob_deletions.discard([ref for ref, _ in pending])
+        uow.commit()
+    return len(pending)
+
+
+__all__ = [
+    'transform_image',
+    'reconcile_transformation_counts',
+    'rebuild_transformation_stats',
+    'rebuild_image_stats',
+    'drain_blob_deletions',
+]
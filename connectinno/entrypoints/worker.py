@@ -6,11 +6,16 @@ from celery import signals
 from sentry_sdk import init as init_sentry
 from sentry_sdk.integrations.celery import CeleryIntegration
 
-from corelib.celery.config import build_application
+from corelib.celery.config import build_application, get_celery_settings
 from connectinno.bootstrap import bootstrap_sync
+from connectinno.drivers.celery.tasks import (
+    drain_blob_deletions,
+    reconcile_transformation_counts,
+)
 
 app = build_application(__name__)
-container = bootstrap_sync(essential_only=True)
+# Mapped before the pool forks, so every worker process inherits the mappers
+container = bootstrap_sync(essential_only=True, start_mappers=True)
 app.dishka_container = container
 
 # Load task modules
@@ -22,6 +27,19 @@ app.autodiscover_tasks(
     force=True,
 )
 
+_settings = get_celery_settings()
+app.conf.beat_schedule = {
+    'reconcile-transformation-counts': {
+        'task': reconcile_transformation_counts.name,
+        'schedule': _settings.TRANSFORMATION_COUNTS_RECONCILE_INTERVAL,
+    },
+    'drain-blob-deletions': {
+        'task': drain_blob_deletions.name,
+        'schedule': _settings.BLOB_DELETIONS_DRAIN_INTERVAL,
+        'kwargs': {'limit': _settings.BLOB_DELETIONS_BATCH_SIZE},
+    },
+}
+
 
 @signals.celeryd_init.connect
 def on_celery_init(sender, instance, conf, options, **kwargs):  # noqa
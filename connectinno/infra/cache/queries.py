@@ -26,8 +26,9 @@ async def wait_celery_task(
     client: AsyncRedis, task_id: str, timeout: Optional[float] = None
 ) -> Optional[str]:
     delay = 0.1
+    elapsed = 0.0
     while True:
-        if delay > timeout:
+        if timeout is not None and elapsed > timeout:
             raise TimeoutError()
         async_result = await get_celery_task(client, task_id)
         if not async_result:
@@ -36,6 +37,7 @@ async def wait_celery_task(
         if ready:
             return async_result
         await asyncio.sleep(delay)
+        elapsed += delay
         delay = min(delay * 1.5, 2)  # exponential backoff, max 2 seconds
 
 
@@ -14,8 +14,10 @@ def start_mappers():
         entities.ImageModel,
         images_table,
         properties={
+            # Loaded explicitly per query by the repositories, an image may
+            # have thousands of transformations across all subtype tables
             'transformations': relationship(
-                entities.BaseTransformation, lazy='selectin', back_populates='image'
+                entities.BaseTransformation, lazy='raise', back_populates='image'
             )
         },
     )
@@ -23,7 +25,11 @@ def start_mappers():
     mapper_registry.map_imperatively(
         entities.BaseTransformation,
         transformation.transformations_table,
-        properties={'image': relationship(entities.ImageModel, lazy='joined')},
+        properties={
+            'image': relationship(
+                entities.ImageModel, lazy='raise', back_populates='transformations'
+            )
+        },
         polymorphic_on=transformation.transformations_table.c.type,
         polymorphic_identity=transformation_types_map[entities.BaseTransformation],
     )
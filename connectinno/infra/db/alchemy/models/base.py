@@ -1,6 +1,24 @@
 from sqlalchemy.orm import registry
-from sqlalchemy import MetaData
+from sqlalchemy import DateTime, MetaData, TypeDecorator
+
+from corelib import timezone
 
 metadata = MetaData()
 
 mapper_registry = registry(metadata=metadata)
+
+
+class UTCDateTime(TypeDecorator):
+    """Naive UTC timestamp column accepting aware datetimes.
+
+    Drivers like asyncpg reject aware values bound to naive columns, they are
+    converted to naive UTC on the way in.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        return timezone.naive_utc(value)
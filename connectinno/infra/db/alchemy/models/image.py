@@ -1,7 +1,8 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime
+from sqlalchemy import Table, Column, Integer, String, Index
 
 from corelib import timezone
-from .base import metadata
+from domain.value_objects.image_status import ImageStatus
+from .base import UTCDateTime, metadata
 
 
 images_table = Table(
@@ -11,5 +12,47 @@ images_table = Table(
     Column('name', String, nullable=False),
     Column('location', String, nullable=False),
     Column('transformation_count', Integer, nullable=False, default=0),
-    Column('created_at', DateTime, nullable=False, default=timezone.now),
+    Column(
+        'status',
+        String,
+        nullable=False,
+        default=ImageStatus.ACTIVE.value,
+        server_default=ImageStatus.ACTIVE.value,
+    ),
+    Column('latest_transformation_type', String, nullable=True),
+    Column('latest_transformation_at', UTCDateTime, nullable=True),
+    Column('created_at', UTCDateTime, nullable=False, default=timezone.now),
+)
+
+# keyset pagination of the ranking
+Index(
+    'ix_images_transformation_count_id',
+    images_table.c.transformation_count.desc(),
+    images_table.c.id,
+)
+
+# keyset pagination of the latest transformations
+Index(
+    'ix_images_latest_transformation_at_id',
+    images_table.c.latest_transformation_at.desc(),
+    images_table.c.id.desc(),
+)
+
+# outbox of superseded image blobs, written in the transaction replacing them
+# and deleted from storage in batches by a background task
+blob_deletions_table = Table(
+    'blob_deletions',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('location', String, nullable=False),
+    Column('created_at', UTCDateTime, nullable=False, default=timezone.now),
+)
+
+# number of images per status, kept in step by the repository so listings
+# don't count the images table
+image_stats_table = Table(
+    'image_stats',
+    metadata,
+    Column('status', String, primary_key=True),
+    Column('count', Integer, nullable=False, default=0),
 )
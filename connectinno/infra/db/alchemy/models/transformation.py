@@ -1,15 +1,17 @@
+import datetime
+
 from sqlalchemy import (
     Table,
     Column,
     Integer,
     String,
-    DateTime,
     ForeignKey,
+    Index,
     CheckConstraint,
 )
 
 from corelib import timezone
-from .base import metadata
+from .base import UTCDateTime, metadata
 
 transformations_table = Table(
     'transformations',
@@ -17,7 +19,15 @@ transformations_table = Table(
     Column('id', Integer, primary_key=True),
     Column('image_id', Integer, ForeignKey('images.id'), nullable=False),
     Column('type', String, nullable=False),
-    Column('created_at', DateTime, nullable=False, default=timezone.now),
+    Column('created_at', UTCDateTime, nullable=False, default=timezone.now),
+    Index('ix_transformations_type', 'type'),
+)
+
+# latest transformations of an image
+Index(
+    'ix_transformations_image_id_created_at',
+    transformations_table.c.image_id,
+    transformations_table.c.created_at.desc(),
 )
 
 gray_scale_transformations_table = Table(
@@ -51,3 +61,16 @@ resize_transformations_table = Table(
     CheckConstraint('height >= 1', name='height_gte_one'),
     CheckConstraint('height <= 4096', name='height_lte_2160'),
 )
+
+# rollup of transformations per type, all time (`total` period, bucketed at
+# STATS_TOTAL_BUCKET) and per UTC day
+STATS_TOTAL_BUCKET = datetime.datetime(1970, 1, 1)
+
+transformation_stats_table = Table(
+    'transformation_stats',
+    metadata,
+    Column('type', String, primary_key=True),
+    Column('period', String, primary_key=True),
+    Column('bucket', UTCDateTime, primary_key=True),
+    Column('count', Integer, nullable=False, default=0),
+)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from corelib.storage import StorageSettings
+
+
+class PoolMetricsMixin:
+    """Records how long checkouts wait for a connection and how often they
+    time out, alongside the live size, checked-out and overflow counts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self._timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        with self._metrics_lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            checkouts = self._checkouts
+            return {
+                'size': self.size(),
+                'checked_out': self.checkedout(),
+                'overflow': max(self.overflow(), 0),
+                'max_overflow': self._max_overflow,
+                'checkouts': checkouts,
+                'timeouts': self._timeouts,
+                'wait_avg': self._wait_total / checkouts if checkouts else 0.0,
+                'wait_max': self._wait_max,
+            }
+
+
+class InstrumentedQueuePool(PoolMetricsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(settings: StorageSettings) -> dict:
+    return {
+        'pool_size': settings.SQL_DB_POOL_SIZE,
+        'max_overflow': settings.SQL_DB_MAX_OVERFLOW,
+        'pool_recycle': settings.SQL_DB_POOL_RECYCLE,
+        'pool_pre_ping': settings.SQL_DB_POOL_PRE_PING,
+        'pool_timeout': settings.SQL_DB_POOL_TIMEOUT,
+    }
+
+
+__all__ = [
+    'InstrumentedQueuePool',
+    'InstrumentedAsyncQueuePool',
+    'pool_options',
+]
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Replication delay in seconds as reported by the replica itself
+_PG_LAG = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+    'THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+_MYSQL_LAG = text('SHOW REPLICA STATUS')
+
+
+class ReplicaAsyncSession(AsyncSession):
+    """Session bound to the read replica (or the primary as a fallback)."""
+
+
+class AsyncReplicaRouter:
+    """Picks the engine serving read-only units of work.
+
+    Without a replica the primary is used. With `max_lag` set, the replica is
+    only used while its replication delay is within the tolerance, the delay
+    is measured at most once per `check_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replica: Optional[AsyncEngine],
+        max_lag: Optional[float],
+        check_interval: float,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self._lag_cache = TTLCache(maxsize=1, ttl=check_interval)
+        self._lock = asyncio.Lock()
+
+    async def _measure_lag(self) -> Optional[float]:
+        async with self.replica.connect() as conn:
+            dialect = conn.dialect.name
+            if dialect == 'postgresql':
+                lag = (await conn.execute(_PG_LAG)).scalar()
+            elif dialect in ('mysql', 'mariadb'):
+                row = (await conn.execute(_MYSQL_LAG)).mappings().first()
+                lag = row and row.get('Seconds_Behind_Source')
+            else:
+                return 0.0
+        return None if lag is None else float(lag)
+
+    async def lag(self) -> Optional[float]:
+        async with self._lock:
+            if 'lag' not in self._lag_cache:
+                try:
+                    self._lag_cache['lag'] = await self._measure_lag()
+                except Exception:
+                    logger.exception('Replica lag check failed')
+                    self._lag_cache['lag'] = None
+            return self._lag_cache['lag']
+
+    async def engine(self) -> AsyncEngine:
+        if self.replica is None:
+            return self.primary
+        if self.max_lag is None:
+            return self.replica
+        lag = await self.lag()
+        if lag is None or lag > self.max_lag:
+            return self.primary
+        return self.replica
+
+    async def dispose(self):
+        if self.replica is not None:
+            await self.replica.dispose()
+
+
+__all__ = ['AsyncReplicaRouter', 'ReplicaAsyncSession']
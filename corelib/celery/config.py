@@ -22,6 +22,10 @@ class CelerySettings(StorageSettings, RabbitMQSettings, RedisSettings):
 
     CELERY_EXECUTION_EVENTS_EXCHANGE: str = 'celery.execution_events'
 
+    TRANSFORMATION_COUNTS_RECONCILE_INTERVAL: timedelta = timedelta(hours=1)
+    BLOB_DELETIONS_DRAIN_INTERVAL: timedelta = timedelta(minutes=1)
+    BLOB_DELETIONS_BATCH_SIZE: int = 500
+
     @field_validator('SERVER_NAME', mode='before')
     @classmethod
     def assemble_server_name(cls, v: Optional[str], info: ValidationInfo) -> str:  # noqa
@@ -0,0 +1,20 @@
+import functools
+from typing import Literal, Optional
+
+from pydantic import PositiveFloat, PositiveInt
+from pydantic_settings import BaseSettings
+
+
+class ComputeSettings(BaseSettings):
+    # Defaults to the number of CPUs when omitted
+    COMPUTE_POOL_SIZE: Optional[PositiveInt] = None
+    COMPUTE_TASK_TIMEOUT: PositiveFloat = 30
+    # Recycle workers to release memory fragmented by large images
+    COMPUTE_MAX_TASKS_PER_CHILD: Optional[PositiveInt] = None
+    # Forking a process which runs an event loop and IO threads is unsafe
+    COMPUTE_START_METHOD: Literal['spawn', 'forkserver'] = 'forkserver'
+
+
+@functools.cache
+def get_compute_settings() -> ComputeSettings:
+    return ComputeSettings()
@@ -0,0 +1,16 @@
+import functools
+from typing import Optional
+
+from pydantic import PositiveInt
+from pydantic_settings import BaseSettings
+
+
+class MessageBusSettings(BaseSettings):
+    # Event handlers marked independent run concurrently, at most this many at
+    # a time, they run one after another when omitted
+    MESSAGEBUS_MAX_CONCURRENCY: Optional[PositiveInt] = None
+
+
+@functools.cache
+def get_messagebus_settings() -> MessageBusSettings:
+    return MessageBusSettings()
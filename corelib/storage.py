@@ -11,6 +11,24 @@ from pydantic import (
 )
 from pydantic_settings import BaseSettings
 
+# Async DBAPI used for each dialect when SQL_DB_ASYNC_URL is not set explicitly
+ASYNC_SQL_DRIVERS = {
+    'postgresql': 'asyncpg',
+    'mysql': 'aiomysql',
+    'sqlite': 'aiosqlite',
+}
+
+
+def async_sql_url(url: Optional[str]) -> Optional[str]:
+    if url is None:
+        return None
+    scheme, _, rest = url.partition('://')
+    dialect = scheme.split('+')[0]
+    driver = ASYNC_SQL_DRIVERS.get(dialect)
+    if driver is None:
+        return url
+    return f'{dialect}+{driver}://{rest}'
+
 
 class StorageSettings(BaseSettings):
     HOME_ROOT: Annotated[DirectoryPath, AfterValidator(str)] = '/home'
@@ -18,6 +36,17 @@ class StorageSettings(BaseSettings):
 
     LOW_MEM: bool = True
 
+    UPLOAD_MAX_BYTES: int = 64 * 1024 * 1024
+    UPLOAD_MAX_HEADER_BYTES: int = 1024 * 1024
+
+    # Local read-through cache of source images, the budget is per process
+    FILE_CACHE_ENABLED: bool = False
+    FILE_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+
+    TRANSFORM_CACHE_ENABLED: bool = False
+    TRANSFORM_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+    TRANSFORM_CACHE_PREFIX: str = 'transform-cache'
+
     # Assuming mongodb by default
     SQL_DB_HOST: str = 'localhost'
     SQL_DB_PORT: str = '27017'
@@ -43,6 +72,49 @@ class StorageSettings(BaseSettings):
             name=info.data.get('SQL_DB_NAME'),
         )
 
+    SQL_DB_ASYNC_URL: Annotated[Optional[AnyUrl], AfterValidator(str)] = Field(
+        None, exclude=True
+    )
+
+    @field_validator('SQL_DB_ASYNC_URL', mode='before')
+    @classmethod
+    def assemble_async_sqldb_connection(
+        cls, v: Optional[str], info: ValidationInfo
+    ) -> Optional[str]:  # noqa
+        if isinstance(v, str):
+            return v
+        return async_sql_url(info.data.get('SQL_DB_URL'))
+
+    # Optional read replica for read-only units of work, the primary is used
+    # when unset. With SQL_DB_REPLICA_MAX_LAG (seconds) reads fall back to the
+    # primary while the replica lags behind more than that.
+    SQL_DB_REPLICA_URL: Optional[Annotated[AnyUrl, AfterValidator(str)]] = Field(
+        None, exclude=True
+    )
+    SQL_DB_REPLICA_ASYNC_URL: Optional[Annotated[AnyUrl, AfterValidator(str)]] = Field(
+        None, exclude=True
+    )
+
+    @field_validator('SQL_DB_REPLICA_ASYNC_URL', mode='before')
+    @classmethod
+    def assemble_async_replica_connection(
+        cls, v: Optional[str], info: ValidationInfo
+    ) -> Optional[str]:  # noqa
+        if isinstance(v, str):
+            return v
+        return async_sql_url(info.data.get('SQL_DB_REPLICA_URL'))
+
+    SQL_DB_REPLICA_MAX_LAG: Optional[float] = None
+    SQL_DB_REPLICA_LAG_CHECK_INTERVAL: float = 5
+
+    # Per process connection pool, size it to the worker threads (or
+    # concurrent requests) that may hold a session at once
+    SQL_DB_POOL_SIZE: int = 5
+    SQL_DB_MAX_OVERFLOW: int = 10
+    SQL_DB_POOL_RECYCLE: int = 1800
+    SQL_DB_POOL_PRE_PING: bool = True
+    SQL_DB_POOL_TIMEOUT: float = 30
+
     # Assuming mongodb by default
     NOSQL_DB_HOST: str = 'localhost'
     NOSQL_DB_PORT: str = '27017'
@@ -7,5 +7,12 @@ def now():
     return datetime.now(tz=utc)
 
 
+def naive_utc(moment: datetime) -> datetime:
+    """Same instant as a naive UTC datetime, naive values are assumed UTC."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(utc).replace(tzinfo=None)
+
+
 def today():
     return now().date()
@@ -4,6 +4,10 @@ from starlette import status
 HTTP_422_NOT_FOUND_EXCEPTION = HTTPException(
     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='unprocessable_entity'
 )
+HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail='request_entity_too_large',
+)
 HTTP_404_NOT_FOUND_EXCEPTION = HTTPException(
     status_code=status.HTTP_404_NOT_FOUND, detail='not_found'
 )
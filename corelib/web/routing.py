@@ -0,0 +1,42 @@
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+
+from corelib.web.constants import HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION
+
+
+class LimitedBodyRoute(APIRoute):
+    """Route rejecting request bodies larger than `body_limit()` bytes.
+
+    The declared Content-Length is checked before anything is read, bodies
+    without one are counted while they are received, so an oversized request
+    is never buffered or spooled in full. Subclasses resolve the limit per
+    request, e.g. from the settings the handlers use.
+    """
+
+    async def body_limit(self, scope) -> Optional[int]:
+        return None
+
+    async def handle(self, scope, receive, send):
+        limit = await self.body_limit(scope)
+        if limit is None:
+            return await super().handle(scope, receive, send)
+        length = Headers(scope=scope).get('content-length', '')
+        if length.isdigit() and int(length) > limit:
+            raise HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    raise HTTP_413_REQUEST_ENTITY_TOO_LARGE_EXCEPTION
+            return message
+
+        await super().handle(scope, limited_receive, send)
+
+
+__all__ = ['LimitedBodyRoute']
@@ -1,3 +1,4 @@
+import asyncio
 from io import BytesIO
 from typing import Optional
 
@@ -12,14 +13,60 @@ from PIL.Image import Image
 class ImageAggregate(BaseModel):
     image_info: ImageModel
     fs: AbstractFileSystem
+    # the storage behind `fs` when that is a local whole-file cache, ranged
+    # and metadata reads go there instead of downloading the whole file
+    origin_fs: Optional[AbstractFileSystem] = None
     image: Optional[Image] = None
+    # transformations recorded since the image was last persisted
+    new_transformations: list = []
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def load(self):
-        with self.fs.open(self.image_info.location) as f:
-            self.image = PIL.Image.open(BytesIO(f.read()))
+    def load(self, size: Optional[tuple[int, int]] = None, mode: Optional[str] = None):
+        self.image = self.decode(self.read(), size=size, mode=mode)
         return self
 
+    def read(self) -> bytes:
+        with self.fs.open(self.image_info.location) as f:
+            return f.read()
+
+    @property
+    def _origin(self) -> AbstractFileSystem:
+        return self.origin_fs or self.fs
+
+    def read_range(self, start: int, end: int) -> bytes:
+        return self._origin.cat_file(self.image_info.location, start=start, end=end)
+
+    def exists(self) -> bool:
+        return self._origin.exists(self.image_info.location)
+
+    def size(self) -> int:
+        return self._origin.size(self.image_info.location)
+
+    # Counterparts of the storage calls above for event loops
+
+    async def aread(self) -> bytes:
+        return await asyncio.to_thread(self.read)
+
+    async def aexists(self) -> bool:
+        return await asyncio.to_thread(self.exists)
+
+    async def asize(self) -> int:
+        return await asyncio.to_thread(self.size)
+
+    @staticmethod
+    def decode(
+        data: bytes,
+        size: Optional[tuple[int, int]] = None,
+        mode: Optional[str] = None,
+    ) -> Image:
+        image = PIL.Image.open(BytesIO(data))
+        if size or mode:
+            # Let the decoder produce a reduced (at least `size` large) and/or
+            # gray scale image when it supports it, e.g. JPEG DCT scaling.
+            # Decoders without draft support ignore the request.
+            image.draft(mode, size)
+        return image
+
     def __hash__(self):
         return self.image_info.__hash__()
@@ -4,6 +4,7 @@ from typing import Optional
 
 from pydantic import BaseModel, HttpUrl
 
+from domain.value_objects.image_status import ImageStatus
 from domain.value_objects.transformation_type import TransformationType
 
 
@@ -12,7 +13,10 @@ class ImageModel:
     name: Optional[str] = None
     location: Optional[str] = None
     transformation_count: int = 0
-    transformations: list = field(default_factory=list)
+    status: str | ImageStatus = ImageStatus.ACTIVE
+    latest_transformation_type: Optional[str | TransformationType] = None
+    latest_transformation_at: Optional[datetime.datetime] = None
+    transformations: list = field(default_factory=list, compare=False)
     created_at: Optional[datetime.datetime] = None
     id: Optional[int] = None
 
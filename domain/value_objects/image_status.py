@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ImageStatus(str, Enum):
+    PENDING = 'pending'
+    ACTIVE = 'active'
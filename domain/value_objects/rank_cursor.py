@@ -0,0 +1,13 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RankCursor(BaseModel):
+    # keyset of the last ranked image
+    count: int
+    id: int
+    # rank and 1-based position of that image, to carry the ranking over
+    rank: int
+    position: int
+    total: Optional[int] = None
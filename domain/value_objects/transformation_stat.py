@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel
 
 from .transformation_type import TransformationType
@@ -6,3 +8,8 @@ from .transformation_type import TransformationType
 class TransformationByType(BaseModel):
     type: TransformationType
     count: int
+
+
+class StatsPeriod(str, Enum):
+    TOTAL = 'total'
+    DAY = 'day'
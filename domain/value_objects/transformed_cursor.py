@@ -0,0 +1,12 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TransformedImageCursor(BaseModel):
+    # keyset of the last listed image, `at` is None once the listing moved on
+    # to images without any transformation
+    at: Optional[datetime.datetime]
+    id: int
+    total: Optional[int] = None
@@ -0,0 +1,107 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+from fsspec.implementations.cached import WholeFileCacheFileSystem
+
+# CachingFileSystem forwards every attribute it does not list itself to the
+# target filesystem, the methods below have to be routed back explicitly
+_OWN_METHODS = frozenset({'_open', '_touch', '_evict', 'lru_stats'})
+
+
+class LRUFileCacheFileSystem(WholeFileCacheFileSystem):
+    """Whole file read-through cache bounded to `max_bytes` of local disk.
+
+    Files are downloaded on first open and served from disk afterwards, the
+    least recently opened ones are evicted once the budget is exceeded. The
+    budget and recency are tracked in process memory, so the cache storage
+    must not be shared with other processes, see `process_storage`.
+    """
+
+    def __init__(self, max_bytes: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self._lru_lock = threading.Lock()
+        self._lru: OrderedDict[str, int] = OrderedDict()
+        self._lru_bytes = 0
+        self._evictions = 0
+        # files left over from a previous run count against the budget
+        cached = self._metadata.cached_files[-1]
+        for path, detail in sorted(cached.items(), key=lambda kv: kv[1]['time']):
+            fn = os.path.join(self.storage[-1], detail['fn'])
+            if os.path.exists(fn):
+                self._lru[path] = os.path.getsize(fn)
+                self._lru_bytes += self._lru[path]
+        self._evict()
+
+    def __getattribute__(self, item):
+        if item in _OWN_METHODS:
+            return getattr(type(self), item).__get__(self)
+        return super().__getattribute__(item)
+
+    def _open(self, path, mode='rb', **kwargs):
+        f = super()._open(path, mode=mode, **kwargs)
+        if 'r' in mode:
+            self._touch(self._strip_protocol(path), os.fstat(f.fileno()).st_size)
+            self._evict()
+        return f
+
+    def _touch(self, path: str, size: int):
+        with self._lru_lock:
+            self._lru_bytes += size - self._lru.pop(path, 0)
+            self._lru[path] = size
+
+    def _evict(self):
+        while True:
+            with self._lru_lock:
+                if self._lru_bytes <= self.max_bytes or len(self._lru) <= 1:
+                    return
+                path, size = self._lru.popitem(last=False)
+                self._lru_bytes -= size
+                self._evictions += 1
+            self.pop_from_cache(path)
+
+    def pop_from_cache(self, path):
+        path = self._strip_protocol(path)
+        with self._lru_lock:
+            self._lru_bytes -= self._lru.pop(path, 0)
+        try:
+            super().pop_from_cache(path)
+        except FileNotFoundError:
+            pass
+
+    def lru_stats(self) -> dict:
+        with self._lru_lock:
+            return {
+                'entries': len(self._lru),
+                'size': self._lru_bytes,
+                'max_size': self.max_bytes,
+                'evictions': self._evictions,
+            }
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def process_storage(root: str) -> str:
+    """Cache directory of the current process under `root`.
+
+    Directories left by processes that exited are removed, their files are
+    not accounted for by anyone.
+    """
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            if name.isdigit() and int(name) != os.getpid() and not _alive(int(name)):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return os.path.join(root, str(os.getpid()))
+
+
+__all__ = ['LRUFileCacheFileSystem', 'process_storage']
@@ -10,6 +10,8 @@ from fsspec.implementations.cached import CachingFileSystem
 from fsspec.implementations.local import LocalFileSystem
 from gcsfs import GCSFileSystem
 
+from fileslib.cached_fs import LRUFileCacheFileSystem, process_storage
+
 from pydantic import BaseModel, DirectoryPath, HttpUrl, Field, model_serializer
 from pydantic_core.core_schema import SerializationInfo
 
@@ -110,6 +112,23 @@ class DefaultFSFactory:
             same_names=self._default_cache_storage.same_names,
         )
 
+    def lru_cached(
+        self, fs: AbstractFileSystem, max_bytes: int
+    ) -> LRUFileCacheFileSystem:
+        assert not isinstance(fs, CachingFileSystem), f'Unexpected type({type(fs)})'
+        return LRUFileCacheFileSystem(
+            fs=fs,
+            max_bytes=max_bytes,
+            # each process enforces the budget on a directory of its own
+            cache_storage=process_storage(
+                f'{self._default_cache_storage.cache_storage}/lru'
+            ),
+            expiry_time=self._default_cache_storage.expiry_time,
+            # entries are invalidated explicitly by the file registry
+            check_files=False,
+            same_names=self._default_cache_storage.same_names,
+        )
+
     def create_cache_mapper(self) -> Callable[[str], PathLike]:
         mapper = create_cache_mapper(self._default_cache_storage.same_names)
 
@@ -5,6 +5,8 @@ from io import IOBase
 from math import ceil
 from urllib.request import urlopen, Request
 
+from fsspec import AbstractFileSystem
+from fsspec.asyn import AsyncFileSystem
 from fsspec.implementations.cached import CachingFileSystem
 from tqdm import tqdm
 
@@ -94,4 +96,19 @@ def populate_filecache(remote_path: str, fs: CachingFileSystem):
                 break  # Reached end of file
 
 
-__all__ = ['fetch_file', 'populate_filecache']
+async def run_fs(fs: AbstractFileSystem, method: str, *args, **kwargs):
+    """Await a filesystem method without blocking the running loop.
+
+    Async filesystems (e.g. gcsfs) are driven through their coroutine API, on
+    their own loop when they were created in blocking mode, other filesystems
+    run in worker threads.
+    """
+    if not isinstance(fs, AsyncFileSystem):
+        return await asyncio.to_thread(getattr(fs, method), *args, **kwargs)
+    coro = getattr(fs, f'_{method}')(*args, **kwargs)
+    if fs.asynchronous:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, fs.loop))
+
+
+__all__ = ['fetch_file', 'populate_filecache', 'run_fs']
@@ -1,8 +1,18 @@
+import asyncio
 import dataclasses
 import shutil
+from collections import defaultdict
 from io import IOBase
 from typing import Optional
 from fsspec import AbstractFileSystem
+from fsspec.implementations.cached import CachingFileSystem
+
+from fileslib.io import run_fs
+
+
+def _write(fs: AbstractFileSystem, location: str, buff: IOBase):
+    with fs.open(location, 'wb') as dst:
+        shutil.copyfileobj(buff, dst)
 
 
 class Registry:
@@ -11,20 +21,48 @@ class Registry:
         location: str
         fs: AbstractFileSystem
 
-    def __init__(self, bind: AbstractFileSystem):
+    def __init__(
+        self, bind: AbstractFileSystem, cache: Optional[CachingFileSystem] = None
+    ):
         self._fs = bind
+        self._cache = cache
         self._known_files: list = []
 
+    def _invalidate(self, location: str):
+        if self._cache is not None:
+            self._cache.pop_from_cache(location)
+
     def add(self, location: str, buff: IOBase, fs: Optional[AbstractFileSystem] = None):
         assert isinstance(buff, IOBase), 'buff must be IOBase instance'
         assert fs or self._fs, 'fs must exists'
         fs = fs or self._fs
-        with fs.open(location, 'wb') as dst:
-            shutil.copyfileobj(buff, dst)
+        _write(fs, location, buff)
+        self._invalidate(location)
+        self._known_files.append(self.Entry(location=location, fs=fs))
+
+    def copy(self, source: str, location: str, fs: Optional[AbstractFileSystem] = None):
+        assert fs or self._fs, 'fs must exists'
+        fs = fs or self._fs
+        fs.copy(source, location)
+        self._invalidate(location)
         self._known_files.append(self.Entry(location=location, fs=fs))
 
     def remove(self, location):
         self._fs.rm(location)
+        self._invalidate(location)
+
+    def remove_many(self, locations: list[str]):
+        try:
+            self._fs.rm(locations)
+        except FileNotFoundError:
+            # some are gone already, delete the rest one by one
+            for location in locations:
+                try:
+                    self._fs.rm_file(location)
+                except FileNotFoundError:
+                    pass
+        for location in locations:
+            self._invalidate(location)
 
     def commit(self):
         self._known_files.clear()
@@ -35,3 +73,93 @@ class Registry:
                 entry.fs.rm(entry.location)
             except FileNotFoundError:
                 pass
+
+
+class AsyncRegistry:
+    """Registry counterpart for event loops.
+
+    Filesystem calls are awaited through `run_fs`, at most `max_concurrency`
+    writes are in flight and rollback deletes the known files in bulk.
+    """
+
+    Entry = Registry.Entry
+
+    def __init__(
+        self,
+        bind: AbstractFileSystem,
+        cache: Optional[CachingFileSystem] = None,
+        max_concurrency: int = 8,
+    ):
+        self._fs = bind
+        self._cache = cache
+        self._known_files: list = []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    _invalidate = Registry._invalidate
+
+    _run = staticmethod(run_fs)
+
+    async def add(
+        self,
+        location: str,
+        buff: IOBase | bytes,
+        fs: Optional[AbstractFileSystem] = None,
+    ):
+        assert isinstance(buff, IOBase | bytes), 'buff must be IOBase or bytes'
+        assert fs or self._fs, 'fs must exists'
+        fs = fs or self._fs
+        async with self._semaphore:
+            if isinstance(buff, bytes):
+                await self._run(fs, 'pipe_file', location, buff)
+            else:
+                # streamed in chunks, e.g. from a spooled upload
+                await asyncio.to_thread(_write, fs, location, buff)
+        self._invalidate(location)
+        self._known_files.append(self.Entry(location=location, fs=fs))
+
+    async def add_many(
+        self,
+        items: list[tuple[str, IOBase | bytes]],
+        fs: Optional[AbstractFileSystem] = None,
+    ):
+        # let every write settle so all written files are known to rollback
+        results = await asyncio.gather(
+            *(self.add(location, buff, fs) for location, buff in items),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def copy(
+        self, source: str, location: str, fs: Optional[AbstractFileSystem] = None
+    ):
+        assert fs or self._fs, 'fs must exists'
+        fs = fs or self._fs
+        async with self._semaphore:
+            await self._run(fs, 'cp_file', source, location)
+        self._invalidate(location)
+        self._known_files.append(self.Entry(location=location, fs=fs))
+
+    async def remove(self, location):
+        await self._run(self._fs, 'rm', location)
+        self._invalidate(location)
+
+    def commit(self):
+        self._known_files.clear()
+
+    async def rollback(self):
+        locations = defaultdict(list)
+        for entry in self._known_files:
+            locations[entry.fs].append(entry.location)
+        self._known_files.clear()
+        for fs, paths in locations.items():
+            try:
+                await self._run(fs, 'rm', paths)
+            except FileNotFoundError:
+                # some were never written, delete the rest one by one
+                for path in paths:
+                    try:
+                        await self._run(fs, 'rm_file', path)
+                    except FileNotFoundError:
+                        pass
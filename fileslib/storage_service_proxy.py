@@ -1,20 +1,85 @@
+import asyncio
 import datetime
-from typing import Literal
+import threading
+from typing import Literal, Optional
 
 from botocore.client import BaseClient
+from cachetools import TTLCache
 from google.cloud import storage
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 
 class StorageServiceProxy(BaseModel):
     bucket: str
     signature_expires_in: int = 3600
+    # Signed urls are reused for this long, half of their lifetime by default
+    # so a cached url is always valid for at least as long again. 0 disables.
+    signature_cache_ttl: Optional[int] = None
+    signature_cache_size: int = 4096
     client: storage.Client | BaseClient
 
+    _cache: Optional[TTLCache] = PrivateAttr(None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    def model_post_init(self, __context):
+        ttl = self.signature_cache_ttl
+        if ttl is None:
+            ttl = self.signature_expires_in // 2
+        if 0 < ttl < self.signature_expires_in:
+            self._cache = TTLCache(maxsize=self.signature_cache_size, ttl=ttl)
+
+    def _cached(self, key: tuple[str, str]) -> Optional[str]:
+        if self._cache is None:
+            return None
+        with self._lock:
+            return self._cache.get(key)
+
+    def _remember(self, key: tuple[str, str], url: str):
+        if self._cache is None:
+            return
+        with self._lock:
+            self._cache[key] = url
+
     def generate_signed_url(self, location: str, method: Literal['GET', 'PUT']):
+        url = self._cached((location, method))
+        if url is None:
+            url = self._sign(location, method)
+            self._remember((location, method), url)
+        return url
+
+    async def agenerate_signed_url(self, location: str, method: Literal['GET', 'PUT']):
+        url = self._cached((location, method))
+        if url is None:
+            # credentials refresh and signing are blocking, keep them off the loop
+            url = await asyncio.to_thread(self._sign, location, method)
+            self._remember((location, method), url)
+        return url
+
+    async def agenerate_signed_urls(
+        self,
+        locations: list[str],
+        method: Literal['GET', 'PUT'],
+        parallel: bool = False,
+    ) -> list[str]:
+        urls = [self._cached((location, method)) for location in locations]
+        missing = [i for i, url in enumerate(urls) if url is None]
+        if parallel:
+            signed = await asyncio.gather(
+                *(asyncio.to_thread(self._sign, locations[i], method) for i in missing)
+            )
+        else:
+            signed = await asyncio.to_thread(
+                lambda: [self._sign(locations[i], method) for i in missing]
+            )
+        for i, url in zip(missing, signed):
+            urls[i] = url
+            self._remember((locations[i], method), url)
+        return urls
+
+    def _sign(self, location: str, method: Literal['GET', 'PUT']) -> str:
         loc = -1
         if location.startswith('gs://') or location.startswith('s3://'):
             loc = 2
@@ -50,6 +115,3 @@ class StorageServiceProxy(BaseModel):
                             Params={'Bucket': self.bucket, 'Key': location},
                             ExpiresIn=self.signature_expires_in,
                         )
-
-    async def agenerate_signed_url(self, location: str, method: Literal['GET', 'PUT']):
-        raise NotImplementedError()
@@ -0,0 +1,61 @@
+"""transformation_stats
+
+Revision ID: 2a7c5e9d0b18
+Revises: e41b9c3d7f05
+Create Date: 2026-10-18 13:02:51.907113
+
+"""
+
+import datetime
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7c5e9d0b18'
+down_revision: Union[str, None] = 'e41b9c3d7f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOTAL_BUCKET = datetime.datetime(1970, 1, 1)
+
+
+def upgrade() -> None:
+    stats_table = op.create_table(
+        'transformation_stats',
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('period', sa.String(), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('type', 'period', 'bucket'),
+    )
+
+    # backfill, grouped per day by the database and rolled up here
+    transformations = sa.table(
+        'transformations', sa.column('type'), sa.column('created_at')
+    )
+    day = sa.func.date(transformations.c.created_at, type_=sa.Date)
+    daily = op.get_bind().execute(
+        sa.select(transformations.c.type, day, sa.func.count()).group_by(
+            transformations.c.type, day
+        )
+    )
+    stats = Counter()
+    for kind, on, n in daily:
+        stats[(kind, 'total', TOTAL_BUCKET)] += n
+        stats[(kind, 'day', datetime.datetime.combine(on, datetime.time()))] += n
+    if stats:
+        op.bulk_insert(
+            stats_table,
+            [
+                {'type': kind, 'period': period, 'bucket': bucket, 'count': n}
+                for (kind, period, bucket), n in sorted(stats.items())
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('transformation_stats')
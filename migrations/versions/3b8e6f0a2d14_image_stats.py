@@ -0,0 +1,40 @@
+"""image_stats
+
+Revision ID: 3b8e6f0a2d14
+Revises: 7f3a9c1e5b26
+Create Date: 2026-10-18 16:20:44.512087
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e6f0a2d14'
+down_revision: Union[str, None] = '7f3a9c1e5b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    stats_table = op.create_table(
+        'image_stats',
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('status'),
+    )
+
+    images = sa.table('images', sa.column('status'))
+    counts = op.get_bind().execute(
+        sa.select(images.c.status, sa.func.count()).group_by(images.c.status)
+    )
+    rows = [{'status': status, 'count': n} for status, n in counts]
+    if rows:
+        op.bulk_insert(stats_table, rows)
+
+
+def downgrade() -> None:
+    op.drop_table('image_stats')
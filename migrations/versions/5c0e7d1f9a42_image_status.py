@@ -0,0 +1,31 @@
+"""image_status
+
+Revision ID: 5c0e7d1f9a42
+Revises: a23ef2a71df2
+Create Date: 2026-10-18 10:12:41.318524
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e7d1f9a42'
+down_revision: Union[str, None] = 'a23ef2a71df2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'images',
+        sa.Column('status', sa.String(), server_default='active', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.drop_column('status')
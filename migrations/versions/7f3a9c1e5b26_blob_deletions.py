@@ -0,0 +1,33 @@
+"""blob_deletions
+
+Revision ID: 7f3a9c1e5b26
+Revises: b6e18f2c4d93
+Create Date: 2026-10-18 15:41:07.238519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a9c1e5b26'
+down_revision: Union[str, None] = 'b6e18f2c4d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'blob_deletions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('blob_deletions')
@@ -0,0 +1,40 @@
+"""images_rank_index
+
+Revision ID: 8d2f4b6a1c37
+Revises: 5c0e7d1f9a42
+Create Date: 2026-10-18 12:04:19.552310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4b6a1c37'
+down_revision: Union[str, None] = '5c0e7d1f9a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking writes on postgresql but cannot run inside
+    # a transaction, other dialects ignore the flag
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_images_transformation_count_id',
+            'images',
+            [sa.text('transformation_count DESC'), 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_images_transformation_count_id',
+            table_name='images',
+            postgresql_concurrently=True,
+        )
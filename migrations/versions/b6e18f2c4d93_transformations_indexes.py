@@ -0,0 +1,51 @@
+"""transformations_indexes
+
+Revision ID: b6e18f2c4d93
+Revises: 2a7c5e9d0b18
+Create Date: 2026-10-18 13:28:44.610275
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e18f2c4d93'
+down_revision: Union[str, None] = '2a7c5e9d0b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking writes on postgresql but cannot run inside
+    # a transaction, other dialects ignore the flag
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transformations_image_id_created_at',
+            'transformations',
+            ['image_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_transformations_type',
+            'transformations',
+            ['type'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_transformations_type',
+            table_name='transformations',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_transformations_image_id_created_at',
+            table_name='transformations',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,64 @@
+"""images_latest_transformation
+
+Revision ID: e41b9c3d7f05
+Revises: 8d2f4b6a1c37
+Create Date: 2026-10-18 12:31:07.284416
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b9c3d7f05'
+down_revision: Union[str, None] = '8d2f4b6a1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'images', sa.Column('latest_transformation_type', sa.String(), nullable=True)
+    )
+    op.add_column(
+        'images', sa.Column('latest_transformation_at', sa.DateTime(), nullable=True)
+    )
+    op.execute(
+        """
+        UPDATE images SET
+            latest_transformation_type = (
+                SELECT t.type FROM transformations t
+                WHERE t.image_id = images.id
+                ORDER BY t.created_at DESC, t.id DESC
+                LIMIT 1
+            ),
+            latest_transformation_at = (
+                SELECT max(t.created_at) FROM transformations t
+                WHERE t.image_id = images.id
+            )
+        """
+    )
+    # CONCURRENTLY avoids locking writes on postgresql but cannot run inside
+    # a transaction, other dialects ignore the flag
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_images_latest_transformation_at_id',
+            'images',
+            [sa.text('latest_transformation_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_images_latest_transformation_at_id',
+            table_name='images',
+            postgresql_concurrently=True,
+        )
+    with op.batch_alter_table('images') as batch_op:
+        batch_op.drop_column('latest_transformation_at')
+        batch_op.drop_column('latest_transformation_type')
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+from fsspec.implementations.memory import MemoryFileSystem
+
+from fileslib.cached_fs import LRUFileCacheFileSystem, process_storage
+
+
+def _exited_pid() -> int:
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+    return proc.pid
+
+
+def test_process_storage_removes_directories_of_exited_processes(tmp_path):
+    root = tmp_path / 'lru'
+    stale = root / str(_exited_pid())
+    alive = root / str(os.getppid())
+    for path in (stale, alive):
+        path.mkdir(parents=True)
+        (path / 'blob').write_bytes(b'x')
+
+    storage = process_storage(str(root))
+
+    assert storage == str(root / str(os.getpid()))
+    assert not stale.exists()
+    assert alive.exists()
+
+
+def test_budget_is_enforced_per_process_directory(tmp_path):
+    fs = MemoryFileSystem()
+    fs.pipe({'/a': b'a' * 100, '/b': b'b' * 100})
+    root = str(tmp_path / 'lru')
+    cache = LRUFileCacheFileSystem(
+        fs=fs, max_bytes=150, cache_storage=process_storage(root), check_files=False
+    )
+    # another process' files, not part of this budget
+    other = os.path.join(root, str(os.getppid()))
+    os.makedirs(other)
+    with open(os.path.join(other, 'blob'), 'wb') as f:
+        f.write(b'x' * 1000)
+
+    cache.cat_file('/a')
+    cache.cat_file('/b')
+
+    assert cache.lru_stats()['entries'] == 1
+    assert cache.lru_stats()['size'] == 100
+    assert os.path.exists(os.path.join(other, 'blob'))
@@ -0,0 +1,67 @@
+import pytest
+from PIL import Image
+
+from connectinno.app.cv import (
+    CompositeStrategy,
+    GrayScaleStrategy,
+    ResizeStrategy,
+    RotationStrategy,
+    compile_plan,
+)
+
+
+def _image(width: int, height: int) -> Image.Image:
+    image = Image.new('RGB', (width, height))
+    image.putdata(
+        [(x % 256, y % 256, (x * y) % 256) for y in range(height) for x in range(width)]
+    )
+    return image
+
+
+def _angles(plan: CompositeStrategy) -> list[int]:
+    return [s.angle for s in plan.strategies if isinstance(s, RotationStrategy)]
+
+
+@pytest.mark.parametrize(
+    'angles, expected',
+    [
+        ([90, 90], [90, 90]),
+        ([90, 270], [90, 270]),
+        ([45, 45], [45, 45]),
+        ([180, 180], []),
+        ([180, 360], [180]),
+        ([360], []),
+        ([180, 90, 180], [180, 90, 180]),
+    ],
+)
+def test_compile_plan_folds_only_exact_rotations(angles, expected):
+    plan = compile_plan([RotationStrategy(angle=angle) for angle in angles])
+    assert _angles(plan) == expected
+
+
+@pytest.mark.parametrize('size', [(400, 100), (100, 100)])
+@pytest.mark.parametrize(
+    'angles', [[90, 90], [90, 270], [180, 180], [180, 360], [30, 150], [90, 180]]
+)
+def test_compile_plan_keeps_rotation_output(size, angles):
+    image = _image(*size)
+    chain = CompositeStrategy([RotationStrategy(angle=angle) for angle in angles])
+    plan = compile_plan(chain.strategies)
+    assert plan.execute(image).tobytes() == chain.execute(image).tobytes()
+
+
+def test_compile_plan_hoists_gray_scale_and_collapses_resizes():
+    plan = compile_plan(
+        [
+            RotationStrategy(angle=90),
+            ResizeStrategy(height=10, width=20),
+            ResizeStrategy(height=30, width=40),
+            GrayScaleStrategy(),
+        ]
+    )
+    assert [type(s) for s in plan.strategies] == [
+        GrayScaleStrategy,
+        RotationStrategy,
+        ResizeStrategy,
+    ]
+    assert plan.strategies[-1].signature() == 'resize:40x30'
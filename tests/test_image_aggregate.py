@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+
+from connectinno.adapters.image_repository import ImageRepository
+from domain.entities import ImageModel
+from fileslib.cached_fs import LRUFileCacheFileSystem
+
+_SIZE = 256 * 1024
+
+
+class _RecordingFileSystem(MemoryFileSystem):
+    cachable = False
+    protocol = 'recording'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ranges = []
+        # files opened other than for a ranged read, e.g. whole downloads
+        self.opened = []
+        self._ranged = False
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        self.ranges.append((start, end))
+        self._ranged = True
+        try:
+            return super().cat_file(path, start=start, end=end, **kwargs)
+        finally:
+            self._ranged = False
+
+    def _open(self, path, mode='rb', **kwargs):
+        if 'r' in mode and not self._ranged:
+            self.opened.append(path)
+        return super()._open(path, mode=mode, **kwargs)
+
+
+@pytest.fixture
+def storage():
+    fs = _RecordingFileSystem()
+    fs.pipe_file('/bucket/upload.png', os.urandom(_SIZE))
+    yield fs
+    fs.rm('/bucket', recursive=True)
+
+
+@pytest.fixture
+def cache(storage, tmp_path):
+    return LRUFileCacheFileSystem(
+        fs=storage,
+        max_bytes=10 * _SIZE,
+        cache_storage=str(tmp_path),
+        check_files=False,
+    )
+
+
+def test_ranged_reads_bypass_the_file_cache(storage, cache):
+    repository = ImageRepository(session=None, fs=storage, cache=cache)
+    aggregate = repository._new_aggregate(
+        ImageModel(location='/bucket/upload.png', name='upload.png')
+    )
+
+    assert aggregate.exists()
+    assert aggregate.size() == _SIZE
+    assert len(aggregate.read_range(0, 4096)) == 4096
+
+    assert storage.ranges == [(0, 4096)]
+    assert storage.opened == []
+    assert cache.lru_stats()['entries'] == 0
+
+
+def test_whole_reads_go_through_the_file_cache(storage, cache):
+    repository = ImageRepository(session=None, fs=storage, cache=cache)
+    aggregate = repository._new_aggregate(
+        ImageModel(location='/bucket/upload.png', name='upload.png')
+    )
+
+    assert len(aggregate.read()) == _SIZE
+    downloads = len(storage.opened)
+    assert len(aggregate.read()) == _SIZE
+    assert len(storage.opened) == downloads
+    assert cache.lru_stats()['entries'] == 1
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from typing import Literal
+
+import pytest
+from dishka import Provider, Scope, make_async_container, make_container
+
+from connectinno.app.messagebus import AsyncMessageBus, MessageBus, independent
+from connectinno.app.unit_of_work import AbstractAsyncUnitOfWork, AbstractUnitOfWork
+from connectinno.di import FromDI
+from connectinno.ports.repository import IRepository
+from domain.events.base import EventBase
+
+# linear dispatch grows ~10x from 1k to 10k events, quadratic ~100x
+MAX_SCALING = 25
+
+
+class Tick(EventBase):
+    type: Literal['event'] = 'event'
+    remaining: int
+    # the first event queues all the others at once instead of one by one
+    fan_out: bool = False
+
+
+class _Repository(IRepository):
+    def __init__(self):
+        self.seen = set()
+
+
+class _UnitOfWork(AbstractUnitOfWork):
+    def __init__(self):
+        self.messages = []
+        self.images = _Repository()
+
+    def _commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _AsyncUnitOfWork(AbstractAsyncUnitOfWork):
+    def __init__(self):
+        self.messages = []
+        self.images = _Repository()
+
+    async def _commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def _next_events(event: Tick) -> list[Tick]:
+    if event.fan_out:
+        return [Tick(remaining=0) for _ in range(event.remaining)]
+    if event.remaining:
+        return [Tick(remaining=event.remaining - 1)]
+    return []
+
+
+def on_tick(event: Tick, uow: FromDI[AbstractUnitOfWork]):
+    uow.messages.extend(_next_events(event))
+
+
+async def aon_tick(event: Tick, uow: FromDI[AbstractAsyncUnitOfWork]):
+    uow.messages.extend(_next_events(event))
+
+
+# the buses are singletons, subclassed to keep their handlers to this module
+class _MessageBus(MessageBus):
+    pass
+
+
+class _AsyncMessageBus(AsyncMessageBus):
+    pass
+
+
+def _cascade(events: int, fan_out: bool) -> float:
+    bus = _MessageBus(event_handlers={Tick: [on_tick]}, command_handlers={})
+    provider = Provider(scope=Scope.APP)
+    provider.provide(_UnitOfWork, provides=AbstractUnitOfWork)
+    container = make_container(provider)
+    try:
+        started = time.perf_counter()
+        bus.handle(container, Tick(remaining=events - 1, fan_out=fan_out))
+        return time.perf_counter() - started
+    finally:
+        container.close()
+
+
+async def _acascade(events: int, fan_out: bool) -> float:
+    bus = _AsyncMessageBus(event_handlers={Tick: [aon_tick]}, command_handlers={})
+    provider = Provider(scope=Scope.APP)
+    provider.provide(_AsyncUnitOfWork, provides=AbstractAsyncUnitOfWork)
+    container = make_async_container(provider)
+    try:
+        started = time.perf_counter()
+        await bus.handle(container, Tick(remaining=events - 1, fan_out=fan_out))
+        return time.perf_counter() - started
+    finally:
+        await container.close()
+
+
+def _best_of(run, events: int, fan_out: bool, repeat: int = 3) -> float:
+    return min(run(events, fan_out) for _ in range(repeat))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('fan_out', [False, True], ids=['chain', 'fan_out'])
+@pytest.mark.parametrize(
+    'run',
+    [
+        pytest.param(_cascade, id='sync'),
+        pytest.param(lambda *args: asyncio.run(_acascade(*args)), id='async'),
+    ],
+)
+def test_event_cascade_scales_linearly(run, fan_out):
+    small = _best_of(run, 1_000, fan_out)
+    large = _best_of(run, 10_000, fan_out)
+    assert large / small < MAX_SCALING, (small, large)
+
+
+class Ping(EventBase):
+    type: Literal['event'] = 'event'
+
+
+_seen_uows = []
+# both handlers have to reach it before either can go on, run one after the
+# other they time out instead of passing it
+_overlap: asyncio.Barrier
+_passed = []
+
+
+async def _record_uow(uow: AbstractAsyncUnitOfWork):
+    _seen_uows.append(uow)
+    await asyncio.wait_for(_overlap.wait(), timeout=1)
+    _passed.append(uow)
+
+
+@independent
+async def on_ping_a(event: Ping, uow: FromDI[AbstractAsyncUnitOfWork]):
+    await _record_uow(uow)
+
+
+@independent
+async def on_ping_b(event: Ping, uow: FromDI[AbstractAsyncUnitOfWork]):
+    await _record_uow(uow)
+
+
+class _ConcurrentMessageBus(AsyncMessageBus):
+    pass
+
+
+async def _ping(bus: AsyncMessageBus) -> AbstractAsyncUnitOfWork:
+    global _overlap
+    _overlap = asyncio.Barrier(2)
+    provider = Provider(scope=Scope.REQUEST)
+    provider.provide(_AsyncUnitOfWork, provides=AbstractAsyncUnitOfWork)
+    container = make_async_container(provider)
+    try:
+        async with container() as request_container:
+            await bus.handle(request_container, Ping())
+            return await request_container.get(AbstractAsyncUnitOfWork)
+    finally:
+        await container.close()
+
+
+def test_independent_handlers_run_concurrently_in_own_scope():
+    bus = _ConcurrentMessageBus(
+        event_handlers={Ping: [on_ping_a, on_ping_b]},
+        command_handlers={},
+        max_concurrency=2,
+    )
+    # a new loop per run, the concurrency limit must not be bound to the first
+    for _ in range(2):
+        _seen_uows.clear()
+        _passed.clear()
+        request_uow = asyncio.run(_ping(bus))
+        assert len(_passed) == 2
+        assert len({id(uow) for uow in _seen_uows}) == 2
+        assert request_uow not in _seen_uows
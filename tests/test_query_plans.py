@@ -0,0 +1,156 @@
+import datetime
+import random
+
+import pytest
+from sqlalchemy import create_engine, insert, inspect
+from sqlalchemy.pool import StaticPool
+
+from connectinno.adapters.image_repository import ImageRepository
+from connectinno.adapters.transformation_repository import TransformationRepository
+from connectinno.infra.db.alchemy.map import start_mappers
+from connectinno.infra.db.alchemy.models.base import metadata
+from connectinno.infra.db.alchemy.models.image import images_table
+from connectinno.infra.db.alchemy.models.transformation import (
+    transformation_stats_table,
+    transformations_table,
+)
+from domain import entities
+from domain.value_objects.image_status import ImageStatus
+from domain.value_objects.rank_cursor import RankCursor
+from domain.value_objects.transformation_type import TransformationType
+from domain.value_objects.transformed_cursor import TransformedImageCursor
+
+IMAGES = 5_000
+TRANSFORMATIONS = 20_000
+# full scans are fine on tables this small (e.g. the stats rollup)
+SEQ_SCAN_ROWS_THRESHOLD = 1_000
+
+_NOW = datetime.datetime(2026, 10, 1)
+_TYPES = [kind.value for kind in TransformationType]
+
+
+@pytest.fixture(scope='module')
+def engine():
+    if inspect(entities.ImageModel, raiseerr=False) is None:
+        start_mappers()
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    metadata.create_all(engine)
+    rnd = random.Random(0)
+    transformations = [
+        {
+            'id': i,
+            'image_id': rnd.randint(1, IMAGES),
+            'type': _TYPES[i % len(_TYPES)],
+            'created_at': _NOW - datetime.timedelta(minutes=i),
+        }
+        for i in range(1, TRANSFORMATIONS + 1)
+    ]
+    latest = {}
+    for row in transformations:
+        latest.setdefault(row['image_id'], row)
+    images = [
+        {
+            'id': i,
+            'location': f'bucket/{i}.png',
+            'name': f'{i}.png',
+            'status': ImageStatus.ACTIVE.value,
+            'transformation_count': rnd.randint(0, 10),
+            'latest_transformation_type': latest[i]['type'] if i in latest else None,
+            'latest_transformation_at': latest[i]['created_at']
+            if i in latest
+            else None,
+            'created_at': _NOW,
+        }
+        for i in range(1, IMAGES + 1)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(images_table), images)
+        conn.execute(insert(transformations_table), transformations)
+        daily = conn.execute(TransformationRepository._daily_counts_stmt()).all()
+        conn.execute(
+            insert(transformation_stats_table),
+            TransformationRepository._rollup(daily),
+        )
+        conn.exec_driver_sql('ANALYZE')
+    yield engine
+    engine.dispose()
+
+
+def _table_rows(conn) -> dict[str, int]:
+    return {
+        table.name: conn.exec_driver_sql(f'SELECT count(*) FROM {table.name}').scalar()
+        for table in metadata.sorted_tables
+    }
+
+
+def _full_scans(conn, stmt) -> list[str]:
+    compiled = stmt.compile(
+        dialect=conn.dialect, compile_kwargs={'render_postcompile': True}
+    )
+    params = tuple(compiled.params[key] for key in compiled.positiontup)
+    plan = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+    rows = _table_rows(conn)
+    # an index walked in the requested order stops at the LIMIT, anything
+    # else scanned (table or index) is read in full
+    stops_early = getattr(stmt, '_limit_clause', None) is not None and not any(
+        'TEMP B-TREE FOR ORDER BY' in detail for *_, detail in plan
+    )
+    scans = []
+    for *_, detail in plan:
+        words = detail.split()
+        if words[0] != 'SCAN' or rows.get(words[1], 0) <= SEQ_SCAN_ROWS_THRESHOLD:
+            continue
+        if 'INDEX' in words and stops_early:
+            continue
+        scans.append(detail)
+    return scans
+
+
+@pytest.mark.parametrize(
+    'stmt',
+    [
+        pytest.param(
+            lambda: ImageRepository._get_stmt(1, ImageStatus.ACTIVE), id='get'
+        ),
+        pytest.param(
+            lambda: ImageRepository._get_many_stmt([1, 2, 3], ImageStatus.ACTIVE),
+            id='get_many',
+        ),
+        pytest.param(lambda: ImageRepository._rank_images_stmt(100), id='rank_images'),
+        pytest.param(
+            lambda: ImageRepository._rank_images_stmt(
+                100, RankCursor(count=5, id=100, rank=1, position=1)
+            ),
+            id='rank_images_after',
+        ),
+        pytest.param(
+            lambda: ImageRepository._latest_transformations_stmt(101, None, True),
+            id='latest_transformations',
+        ),
+        pytest.param(
+            lambda: ImageRepository._latest_transformations_stmt(
+                101, TransformedImageCursor(at=_NOW, id=100), True
+            ),
+            id='latest_transformations_after',
+        ),
+        pytest.param(lambda: ImageRepository._count_stmt(), id='count_images'),
+        pytest.param(
+            lambda: ImageRepository._sync_images_transformations_stmt([1, 2, 3]),
+            id='sync_images_transformations',
+        ),
+        pytest.param(
+            lambda: TransformationRepository._get_stmt(1), id='get_transformation'
+        ),
+        pytest.param(
+            lambda: TransformationRepository._count_transformation_by_type_stmt(),
+            id='count_transformation_by_type',
+        ),
+        pytest.param(
+            lambda: TransformationRepository._count_transformation_by_type_stmt(7),
+            id='count_transformation_by_type_days',
+        ),
+    ],
+)
+def test_no_full_scans(engine, stmt):
+    with engine.connect() as conn:
+        assert _full_scans(conn, stmt()) == []